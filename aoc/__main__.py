@@ -0,0 +1,5 @@
+import sys
+
+from aoc.tools.runner import main
+
+sys.exit(main())
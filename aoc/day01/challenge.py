@@ -3,7 +3,7 @@
 
 import sys
 
-import regex as re
+from aoc.tools import read_lines_from_file, resolve_source
 
 # Expected answer = 281
 TEST_INPUT = """\
@@ -36,12 +36,6 @@ def write_output(number_pairs):
             print(number_pair, file=file)
 
 
-def read_lines_from_file(path):
-    with open(path, "r", encoding="utf-8") as file:
-        for line in file:
-            yield line
-
-
 def convert_to_number_repr(str_num):
     if num := SPELLED_NUMBERS.get(str_num):
         return num
@@ -49,20 +43,24 @@ def convert_to_number_repr(str_num):
 
 
 # Version 2, including spelled numbers
-def find_first_and_last_numbers(line, regex):
-    all_matches = re.findall(regex, line, overlapped=True)
+def find_first_and_last_numbers(line, pattern):
+    all_matches = pattern.findall(line, overlapped=True)
     first = convert_to_number_repr(all_matches[0])
     last = convert_to_number_repr(all_matches[-1])
     return first, last
 
 
 def main():
+    # Third-party, so the helpers above can be imported without it
+    import regex  # pylint: disable=C0415
+
+    pattern = regex.compile(NUMBERS_REGEX)
     if len(sys.argv) < 2:
         input = (line for line in TEST_INPUT.splitlines())
     else:
-        input = read_lines_from_file(sys.argv[1])
+        input = read_lines_from_file(resolve_source(sys.argv[1]))
 
-    number_pairs = (find_first_and_last_numbers(line, NUMBERS_REGEX) for line in input)
+    number_pairs = (find_first_and_last_numbers(line, pattern) for line in input)
     count = sum(int(first + last) for first, last in number_pairs)
     print(count)
 
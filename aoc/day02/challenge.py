@@ -5,6 +5,8 @@ import sys
 from dataclasses import dataclass
 from enum import StrEnum
 
+from aoc.tools import read_lines_from_file, resolve_source
+
 TEST_INPUT = """\
 Game 1: 3 blue, 4 red; 1 red, 2 green, 6 blue; 2 green
 Game 2: 1 blue, 2 green; 3 green, 4 blue, 1 red; 1 green, 1 blue
@@ -82,12 +84,6 @@ def get_int_from_str(string: str):
     return int(re.search(r"\d+", string).group(0))  # type: ignore
 
 
-def read_lines_from_file(path: str):
-    with open(path, "r", encoding="utf-8") as file:
-        for line in file:
-            yield line
-
-
 def games_id_sum(input):
     """Part 1"""
     validator = GameValidator(
@@ -113,7 +109,7 @@ def main():
     if len(sys.argv) < 2:
         input = (line for line in TEST_INPUT.splitlines())
     else:
-        input = read_lines_from_file(sys.argv[1])
+        input = read_lines_from_file(resolve_source(sys.argv[1]))
     # games_id_sum(input)
     power_set_cubes(input)
 
@@ -2,9 +2,8 @@ import re
 import sys
 from dataclasses import dataclass
 from itertools import islice
-from typing import Generator
 
-YieldStr = Generator[str, None, None]
+from aoc.tools import YieldStr, read_lines_from_file, resolve_source
 
 
 @dataclass
@@ -36,12 +35,6 @@ class Card:
         return frozenset(int(num) for num in re.findall(r"\d+", string))
 
 
-def read_lines_from_file(path):
-    with open(path, "r", encoding="utf-8") as file:
-        for line in file:
-            yield line
-
-
 TEST_INPUT = """\
 Card 1: 41 48 83 86 17 | 83 86  6 31 17  9 48 53
 Card 2: 13 32 20 16 61 | 61 30 68 82 17 32 24 19
@@ -87,7 +80,7 @@ def main():
         input = (line for line in TEST_INPUT.splitlines())
         testing = True
     else:
-        input = read_lines_from_file(sys.argv[1])
+        input = read_lines_from_file(resolve_source(sys.argv[1]))
     # part_1(input, testing)
     part_2(input, testing)
 
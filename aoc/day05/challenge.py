@@ -1,10 +1,13 @@
 import re
+from bisect import bisect_right
 from dataclasses import InitVar, dataclass, field
-from itertools import chain
+from functools import reduce
 from typing import Iterable, Iterator, NamedTuple
 
 import utils.iterutils as itu
 from aoc.tools import YieldStr, run_challenge
+from aoc.tools.cache import cached_parser
+from utils.ranges import RangeSet
 
 
 class RangeIntersections(NamedTuple):
@@ -28,8 +31,7 @@ class MappingRange:
     def map(self, val: int) -> int:
         if val not in self.source:
             raise ValueError(f"Cannot map value, '{val}' is out of {self.source}")
-        i = self.source.index(val)
-        return self.dest[i]
+        return val - self.src_start + self.dest_start
 
     def map_range(self, _range: range) -> range:
         if _range == self.source:
@@ -83,22 +85,87 @@ class MappingRange:
         )
 
 
+@dataclass(slots=True)
+class PiecewiseMap:
+    """Breakpoints of a category map, as described by `utils.ranges.Shifts`."""
+
+    starts: list[int] = field(default_factory=list)
+    stops: list[int] = field(default_factory=list)
+    offsets: list[int] = field(default_factory=list)
+
+    @classmethod
+    def from_ranges(cls, mapping_ranges: Iterable[MappingRange]) -> "PiecewiseMap":
+        piecewise = cls()
+        for mrange in sorted(mapping_ranges):
+            offset = mrange.dest_start - mrange.src_start
+            piecewise.append(mrange.src_start, mrange.src_start + mrange.length, offset)
+        return piecewise
+
+    def append(self, start: int, stop: int, offset: int) -> None:
+        """Adds an interval after the last one, merging them if they are contiguous."""
+        if offset == 0 or start >= stop:
+            return
+        if self.stops and self.stops[-1] == start and self.offsets[-1] == offset:
+            self.stops[-1] = stop
+            return
+        self.starts.append(start)
+        self.stops.append(stop)
+        self.offsets.append(offset)
+
+    def map(self, val: int) -> int:
+        i = bisect_right(self.starts, val) - 1
+        if i >= 0 and val < self.stops[i]:
+            return val + self.offsets[i]
+        return val
+
+    def split(self, start: int, stop: int) -> Iterator[tuple[int, int, int]]:
+        """Pieces `(start, stop, offset)` of `[start, stop)` that are shifted by the same offset."""
+        starts, stops, offsets = self.starts, self.stops, self.offsets
+        i = max(bisect_right(starts, start) - 1, 0)
+        position = start
+        while position < stop and i < len(starts):
+            if stops[i] <= position:
+                i += 1
+            elif position < starts[i]:
+                end = min(starts[i], stop)
+                yield position, end, 0
+                position = end
+            else:
+                end = min(stops[i], stop)
+                yield position, end, offsets[i]
+                position = end
+                i += 1
+        if position < stop:
+            yield position, stop, 0
+
+    def then(self, other: "PiecewiseMap") -> "PiecewiseMap":
+        """
+        Composition that maps a value with this map and then with `other`, for non-negative
+        values. Past the end of both maps every value is mapped to itself.
+        """
+        end = max(self.stops[-1] if self.stops else 0, other.stops[-1] if other.stops else 0)
+        composed = PiecewiseMap()
+        for start, stop, offset in self.split(0, end):
+            for piece_start, piece_stop, piece_offset in other.split(start + offset, stop + offset):
+                composed.append(piece_start - offset, piece_stop - offset, offset + piece_offset)
+        return composed
+
+
 @dataclass
 class CategoryMapper:
     name: str
     iterable: InitVar[Iterable[MappingRange]]
     mapping_ranges: tuple[MappingRange, ...] = field(init=False)
+    piecewise: PiecewiseMap = field(init=False, repr=False)
 
     def __post_init__(self, iterable: Iterable[MappingRange]) -> None:
         if not iterable:
             raise ValueError("parameter 'iterable' can't be empty")
         self.mapping_ranges = tuple(sorted(iterable))
+        self.piecewise = PiecewiseMap.from_ranges(self.mapping_ranges)
 
     def map(self, val: int) -> int:
-        for mrange in self.mapping_ranges:
-            if val in mrange.source:
-                return mrange.map(val)
-        return val
+        return self.piecewise.map(val)
 
     def imap_range(self, r: range) -> Iterator[range]:
         # This method relias in mapping_ranges being sorted
@@ -133,7 +200,8 @@ class CategoryMapper:
         return tuple(self.imap_range(r))
 
 
-def parse_input(input: YieldStr) -> tuple[list[int], Iterator[CategoryMapper]]:
+@cached_parser
+def parse_input(input: YieldStr) -> tuple[list[int], list[CategoryMapper]]:
     def parse_categories() -> Iterator[CategoryMapper]:
         mapping_ranges: list[MappingRange] = []
         capturing_category: bool = False
@@ -162,25 +230,24 @@ def parse_input(input: YieldStr) -> tuple[list[int], Iterator[CategoryMapper]]:
             yield CategoryMapper(name, mapping_ranges)
 
     seeds = [int(seed) for seed in itu.find_numbers(next(input))]
-    return seeds, parse_categories()
+    return seeds, list(parse_categories())
+
+
+def compose_categories(categories: Iterable[CategoryMapper]) -> PiecewiseMap:
+    """Single map equivalent to mapping a value through every category in order."""
+    return reduce(PiecewiseMap.then, (c.piecewise for c in categories), PiecewiseMap())
 
 
 def solution_part_1(input: YieldStr) -> int:
     seeds, categories = parse_input(input)
-    for categorie in categories:
-        seeds = map(categorie.map, seeds)
-    return min(seeds)
+    seed_to_location = compose_categories(categories)
+    return min(map(seed_to_location.map, seeds))
 
 
 def solution_part_2(input: YieldStr) -> int:
     seeds, categories = parse_input(input)
-    seeds_ranges = [itu.length_range(*seed_pair) for seed_pair in itu.batched(seeds, 2)]
-
-    for categorie in categories:
-        mapped_seeds = [categorie.map_range(sr) for sr in seeds_ranges]
-        seeds_ranges = chain.from_iterable(mapped_seeds)
-
-    return min(sr.start for sr in seeds_ranges)
+    seeds_ranges = RangeSet(itu.length_range(*seed_pair) for seed_pair in itu.batched(seeds, 2))
+    return seeds_ranges.map_through(compose_categories(categories)).min()
 
 
 if __name__ == "__main__":
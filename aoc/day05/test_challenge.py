@@ -1,8 +1,15 @@
 import pytest
 
 from aoc.tools import relative_test_file
-
-from .challenge import CategoryMapper, MappingRange, solution_part_1, solution_part_2
+from utils.ranges import RangeSet
+
+from .challenge import (
+    CategoryMapper,
+    MappingRange,
+    compose_categories,
+    solution_part_1,
+    solution_part_2,
+)
 
 
 @pytest.mark.parametrize(
@@ -112,3 +119,15 @@ def test_category_mapper(range_, xresult):
         ],
     )
     assert category.map_range(range_) == xresult
+
+
+def test_compose_categories():
+    categories = [
+        CategoryMapper("first", [MappingRange(50, 98, 2), MappingRange(52, 50, 48)]),
+        CategoryMapper("second", [MappingRange(0, 15, 37), MappingRange(37, 52, 2)]),
+    ]
+    composed = compose_categories(categories)
+    for val in range(120):
+        assert composed.map(val) == categories[1].map(categories[0].map(val))
+    mapped = RangeSet([range(79, 93)]).map_through(composed)
+    assert mapped.min() == min(map(composed.map, range(79, 93)))
@@ -1,15 +1,17 @@
 from __future__ import annotations
 
-import functools
 from collections import Counter
-from dataclasses import dataclass
 from enum import IntEnum, auto
-from typing import Iterable
+from typing import Iterable, Iterator, NamedTuple, Sequence
 
 from aoc.tools import YieldStr, run_challenge
+from aoc.tools.cache import cached_parser
 
 camel_cards_symbols = ("2", "3", "4", "5", "6", "7", "8", "9", "T", "J", "Q", "K", "A")
 camel_cards: dict[str, int] = {symbol: value for value, symbol in enumerate(camel_cards_symbols)}
+CARD_BASE = len(camel_cards_symbols)
+WILDCARD = "J"
+HAND_SIZE = 5
 
 
 # Order matters
@@ -22,73 +24,112 @@ class HandType(IntEnum):
     FOUR_OF_A_KIND = auto()
     FIVE_OF_A_KIND = auto()
 
-    @classmethod
-    def which_type(cls, cards: str) -> HandType:
-        unique_cards = set(cards)
-        num_unique_cards = len(unique_cards)
-
-        if num_unique_cards == 1:
-            return cls.FIVE_OF_A_KIND
-        if num_unique_cards == 2:
-            counts = {cards.count(card) for card in unique_cards}
-            if 4 in counts:
-                return cls.FOUR_OF_A_KIND
-            return cls.FULL_HOUSE
-        if num_unique_cards == 3:
-            counts = {cards.count(card) for card in unique_cards}
-            if 3 in counts:
-                return cls.THREE_OF_A_KIND
-            return cls.TWO_PAIR
-        if num_unique_cards == 4:
-            return cls.ONE_PAIR
-        return cls.HIGH_CARD
-
-
-@dataclass(frozen=True)
-class Hand:
+
+def count_partitions(total: int, largest: int | None = None) -> Iterator[tuple[int, ...]]:
+    """Ways of writing `total` as a sum of counts, from the largest count to the smallest."""
+    if total == 0:
+        yield ()
+        return
+    for count in range(min(total, largest or total), 0, -1):
+        for rest in count_partitions(total - count, count):
+            yield (count, *rest)
+
+
+def hand_types_table() -> dict[tuple[tuple[int, ...], int], HandType]:
+    """
+    Type of every hand by its count signature: the counts of the non-wildcard cards, from
+    the most common, and the number of wildcards. Wildcards always join the most common card.
+    """
+    types_by_counts = {
+        (5,): HandType.FIVE_OF_A_KIND,
+        (4, 1): HandType.FOUR_OF_A_KIND,
+        (3, 2): HandType.FULL_HOUSE,
+        (3, 1, 1): HandType.THREE_OF_A_KIND,
+        (2, 2, 1): HandType.TWO_PAIR,
+        (2, 1, 1, 1): HandType.ONE_PAIR,
+        (1, 1, 1, 1, 1): HandType.HIGH_CARD,
+    }
+    table: dict[tuple[tuple[int, ...], int], HandType] = {}
+    for wildcards in range(HAND_SIZE + 1):
+        for counts in count_partitions(HAND_SIZE - wildcards):
+            best_counts = (counts[0] + wildcards, *counts[1:]) if counts else (wildcards,)
+            table[counts, wildcards] = types_by_counts[best_counts]
+    return table
+
+
+HAND_TYPES = hand_types_table()
+
+
+def count_signature(cards: str, wildcard: str | None = None) -> tuple[tuple[int, ...], int]:
+    if len(cards) != HAND_SIZE:
+        raise ValueError(f"A hand should have {HAND_SIZE} cards, got {cards!r}")
+    counter = Counter(cards)
+    wildcards = counter.pop(wildcard, 0) if wildcard is not None else 0
+    return tuple(sorted(counter.values(), reverse=True)), wildcards
+
+
+class Hand(NamedTuple):
     cards: str
     bid: int
-    j_as_wildcard: bool
-
-    @functools.cached_property
-    def hand_type(self) -> HandType:
-        no_wildcard_hand_type = HandType.which_type(self.cards)
-        is_highest_type = no_wildcard_hand_type == HandType.FIVE_OF_A_KIND
-        cards_counter = Counter(self.cards)
-
-        if not self.j_as_wildcard or is_highest_type or not cards_counter["J"]:
-            return no_wildcard_hand_type
-
-        del cards_counter["J"]
-        most_common_card = cards_counter.most_common(1)[0][0]
-        cards_with_wildcard = self.cards.replace("J", most_common_card)
-        return HandType.which_type(cards_with_wildcard)
-
-    # Implementing __lt__() allows the use of the builtin `sorted()` iterator
-    def __lt__(self, __other):
-        if not isinstance(__other, type(self)):
-            return NotImplemented
-        if self.hand_type != __other.hand_type:
-            return self.hand_type < __other.hand_type
-        for self_card, other_card in zip(self.cards, __other.cards):
-            if camel_cards[self_card] == camel_cards[other_card]:
-                continue
-            return camel_cards[self_card] < camel_cards[other_card]
-        return False  # hands are the same
-
-
-def parse_input(input: YieldStr, j_as_wildcard: bool = False) -> list[Hand]:
+
+
+def card_values(wildcard: str | None = None) -> dict[str, int]:
+    """Value of each card, the wildcard (if any) becomes the weakest card."""
+    if wildcard is None:
+        return dict(camel_cards)
+    symbols = (wildcard, *(symbol for symbol in camel_cards_symbols if symbol != wildcard))
+    return {symbol: value for value, symbol in enumerate(symbols)}
+
+
+def hand_type(cards: str, wildcard: str | None = None) -> HandType:
+    return HAND_TYPES[count_signature(cards, wildcard)]
+
+
+def classify_hands(column: Iterable[str], wildcard: str | None = None) -> list[HandType]:
+    """Types of many hands, each distinct hand is only classified once."""
+    known: dict[str, HandType] = {}
+    types: list[HandType] = []
+    for cards in column:
+        kind = known.get(cards)
+        if kind is None:
+            kind = known[cards] = hand_type(cards, wildcard)
+        types.append(kind)
+    return types
+
+
+def sort_key(cards: str, values: dict[str, int], wildcard: str | None = None) -> int:
+    """The hand type followed by the value of each card, as the digits of a base 13 number."""
+    return card_digits(hand_type(cards, wildcard), cards, values)
+
+
+def card_digits(key: int, cards: str, values: dict[str, int]) -> int:
+    for card in cards:
+        key = key * CARD_BASE + values[card]
+    return key
+
+
+def rank_winnings(hands: Sequence[Hand], keys: Sequence[int]) -> int:
+    # Sorting the indices keeps hands with equal keys in their original order
+    ranking = sorted(range(len(hands)), key=keys.__getitem__)
+    return sum(rank * hands[i].bid for rank, i in enumerate(ranking, 1))
+
+
+def total_winnings(hands: Sequence[Hand], wildcard: str | None = None) -> int:
+    values = card_values(wildcard)
+    column = [hand.cards for hand in hands]
+    types = classify_hands(column, wildcard)
+    return rank_winnings(hands, [card_digits(*key, values) for key in zip(types, column)])
+
+
+@cached_parser
+def parse_input(input: YieldStr) -> list[Hand]:
     hands: list[Hand] = []
     for line in input:
         cards, bid = line.split()
-        hands.append(Hand(cards, int(bid), j_as_wildcard))
+        hands.append(Hand(cards, int(bid)))
     return hands
 
 
-def total_winnings(hands: Iterable[Hand]):
-    return sum(rank * hand.bid for rank, hand in enumerate(sorted(hands), 1))
-
-
 def solution_part_1(input: YieldStr) -> int:
     hands = parse_input(input)
     output = total_winnings(hands)
@@ -96,11 +137,22 @@ def solution_part_1(input: YieldStr) -> int:
 
 
 def solution_part_2(input: YieldStr) -> int:
-    camel_cards["J"] = -1  # Make J the weakest card
-    hands = parse_input(input, j_as_wildcard=True)
-    output = total_winnings(hands)
+    hands = parse_input(input)
+    output = total_winnings(hands, wildcard=WILDCARD)
     return output
 
 
+def solution_both_parts(input: YieldStr) -> tuple[int, int]:
+    """Both solutions, computing the keys of both rules in a single pass over the hands."""
+    hands = parse_input(input)
+    values, wildcard_values = card_values(), card_values(WILDCARD)
+    keys: list[int] = []
+    wildcard_keys: list[int] = []
+    for cards, _ in hands:
+        keys.append(sort_key(cards, values))
+        wildcard_keys.append(sort_key(cards, wildcard_values, WILDCARD))
+    return rank_winnings(hands, keys), rank_winnings(hands, wildcard_keys)
+
+
 if __name__ == "__main__":
     run_challenge(solution_part_2, relative_to=__file__, debug=True)
@@ -4,7 +4,15 @@ import pytest
 
 from aoc.tools import read_lines_from_file
 
-from .challenge import solution_part_1, solution_part_2
+from .challenge import (
+    HandType,
+    card_values,
+    classify_hands,
+    solution_both_parts,
+    solution_part_1,
+    solution_part_2,
+    sort_key,
+)
 
 INPUT_PATH = Path(__file__).parent / "test-input.txt"
 
@@ -19,3 +27,44 @@ INPUT_PATH = Path(__file__).parent / "test-input.txt"
 def test_solution(solution, input_path, output):
     input = read_lines_from_file(input_path)
     assert solution(input) == output
+
+
+def test_solution_both_parts():
+    assert solution_both_parts(read_lines_from_file(INPUT_PATH)) == (6440, 5905)
+    # The wildcard rule of part 2 doesn't leak into part 1
+    assert solution_part_1(read_lines_from_file(INPUT_PATH)) == 6440
+
+
+def test_sort_key():
+    values, wildcard_values = card_values(), card_values("J")
+    assert sort_key("KTJJT", values) < sort_key("KK677", values)
+    assert sort_key("KTJJT", wildcard_values, "J") > sort_key("QQQJA", wildcard_values, "J")
+    assert sort_key("JJJJJ", wildcard_values, "J") // 13**5 == HandType.FIVE_OF_A_KIND
+
+
+def test_classify_hands():
+    hands = ["32T3K", "T55J5", "KK677", "KTJJT", "QQQJA", "JJJJJ", "AJ2J3"]
+    assert classify_hands(hands) == [
+        HandType.ONE_PAIR,
+        HandType.THREE_OF_A_KIND,
+        HandType.TWO_PAIR,
+        HandType.TWO_PAIR,
+        HandType.THREE_OF_A_KIND,
+        HandType.FIVE_OF_A_KIND,
+        HandType.ONE_PAIR,
+    ]
+    assert classify_hands(hands, "J") == [
+        HandType.ONE_PAIR,
+        HandType.FOUR_OF_A_KIND,
+        HandType.TWO_PAIR,
+        HandType.FOUR_OF_A_KIND,
+        HandType.FOUR_OF_A_KIND,
+        HandType.FIVE_OF_A_KIND,
+        HandType.THREE_OF_A_KIND,
+    ]
+
+
+@pytest.mark.parametrize("cards", ["", "KK67", "KK6777"])
+def test_hand_size(cards):
+    with pytest.raises(ValueError, match="should have 5 cards"):
+        classify_hands([cards])
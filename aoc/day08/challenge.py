@@ -1,9 +1,11 @@
-import math
 import re
+from array import array
 from itertools import cycle
-from typing import Callable, Iterator, NamedTuple
+from typing import Collection, Iterable, Iterator, NamedTuple, Sequence
 
 from aoc.tools import YieldStr, run_challenge
+from aoc.tools.cache import cached_parser
+from utils.extra_math import EventuallyPeriodic, first_common_value
 
 
 class Node(NamedTuple):
@@ -14,6 +16,7 @@ class Node(NamedTuple):
 Network = dict[str, Node]
 
 
+@cached_parser
 def parse_input(input: YieldStr) -> tuple[str, Network]:
     instructions = next(input).strip()
     node_expression = re.compile(r"^(?P<node>\w+)\s*=\s*\((?P<left>\w+),\s*(?P<right>\w+)\)$")
@@ -41,40 +44,150 @@ def walk_network(start: str, directions: str, network: Network) -> Iterator[str]
         current_node = network[next_node]
 
 
-def steps_until_condition(
-    start: str,
-    end_condition: Callable[[str], bool],
-    directions: str,
-    network: Network,
-) -> int:
-    steps = 0
-    for node in walk_network(start, directions, network):
-        if end_condition(node):
-            break
-        steps += 1
+class IndexedNetwork:
+    """
+    Network with its nodes interned as indices, the left and right nodes of each node are
+    stored in two arrays. `jump` has the node reached from each node after a full pass over
+    the directions, so walks can advance a pass at a time.
+    """
+
+    __slots__ = ("names", "ids", "left", "right", "directions", "jump")
+
+    def __init__(self, directions: str, network: Network) -> None:
+        self.names = list(network)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.left = array("l", (self.ids[node.left] for node in network.values()))
+        self.right = array("l", (self.ids[node.right] for node in network.values()))
+        self.directions = directions
+        self.jump = self.walk_pass()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def walk_pass(
+        self,
+        ends: Collection[int] = (),
+        hits: list[list[int]] | None = None,
+    ) -> list[int]:
+        """
+        Walks from every node at once for a pass over the directions, returning where each
+        walk ends. If `hits` is given, the steps of the pass in which the walk from node `i`
+        is at one of the `ends` are appended to `hits[i]`.
+        """
+        is_end = bytearray(len(self))
+        for end in ends:
+            is_end[end] = 1
+        positions = list(range(len(self)))
+        for step, direction in enumerate(self.directions):
+            if hits is not None:
+                for i, position in enumerate(positions):
+                    if is_end[position]:
+                        hits[i].append(step)
+            targets = self.left if direction == "L" else self.right
+            positions = [targets[position] for position in positions]
+        return positions
+
+    def pass_hits(self, ends: Collection[int]) -> list[list[int]]:
+        """Steps of a pass in which the walk from each node is at one of the `ends`."""
+        hits: list[list[int]] = [[] for _ in range(len(self))]
+        self.walk_pass(ends, hits)
+        return hits
+
+
+class JumpTables:
+    """
+    Answers where a walk is after any number of steps in O(log steps). `levels[i]` has the
+    node reached from every node after 2**i passes over the directions, `phases[r]` the
+    node reached after `r` more steps of a pass.
+    """
+
+    __slots__ = ("network", "levels", "phases")
+
+    def __init__(self, network: IndexedNetwork) -> None:
+        self.network = network
+        positions = array("l", range(len(network)))
+        self.phases = [positions]
+        for direction in network.directions[:-1]:
+            targets = network.left if direction == "L" else network.right
+            positions = array("l", [targets[position] for position in positions])
+            self.phases.append(positions)
+        self.levels = [array("l", network.jump)]
+
+    def _extend_levels(self, passes: int) -> None:
+        while len(self.levels) < passes.bit_length():
+            level = self.levels[-1]
+            self.levels.append(array("l", [level[node] for node in level]))
+
+    def _position_after(self, node: int, steps: int) -> int:
+        if steps < 0:
+            raise ValueError("steps can't be negative")
+        passes, phase = divmod(steps, len(self.network.directions))
+        self._extend_levels(passes)
+        level = 0
+        while passes:
+            if passes & 1:
+                node = self.levels[level][node]
+            passes >>= 1
+            level += 1
+        return self.phases[phase][node]
+
+    def position_after(self, start: str, steps: int) -> str:
+        network = self.network
+        return network.names[self._position_after(network.ids[start], steps)]
+
+    def positions_after(self, queries: Iterable[tuple[str, int]]) -> list[str]:
+        """Answers many `(start, steps)` queries, sharing the tables between them."""
+        return [self.position_after(start, steps) for start, steps in queries]
+
+
+def find_end_steps(
+    network: IndexedNetwork,
+    start: int,
+    hits: Sequence[Sequence[int]],
+) -> EventuallyPeriodic:
+    """
+    Steps in which the walk from `start` is at an end node. Walks a pass at a time until the
+    node at the start of a pass repeats, from then on the walk repeats.
+    """
+    pass_length = len(network.directions)
+    seen: dict[int, int] = {}
+    steps: list[int] = []
+    node = start
+    while node not in seen:
+        offset = len(seen) * pass_length
+        seen[node] = len(seen)
+        steps.extend(offset + step for step in hits[node])
+        node = network.jump[node]
+
+    cycle_start = seen[node] * pass_length
+    period = (len(seen) - seen[node]) * pass_length
+    return EventuallyPeriodic.from_values(steps, cycle_start, period)
+
+
+def steps_to_ends(network: IndexedNetwork, starts: Sequence[str], ends: Sequence[str]) -> int:
+    """Steps until the walks from every start node are at one of the end nodes at once."""
+    end_ids = [network.ids[end] for end in ends]
+    hits = network.pass_hits(end_ids)
+    end_steps = [find_end_steps(network, network.ids[start], hits) for start in starts]
+    steps = first_common_value(end_steps)
+    if steps is None:
+        raise ValueError("The walks never reach the end nodes at the same time")
     return steps
 
 
-def steps_to_node(start: str, target: str, directions: str, network: Network) -> int:
-    return steps_until_condition(start, lambda node: node == target, directions, network)
-
-
 def solution_part_1(input: YieldStr) -> int:
     directions, network = parse_input(input)
-    steps = steps_to_node("AAA", "ZZZ", directions, network)
+    steps = steps_to_ends(IndexedNetwork(directions, network), ["AAA"], ["ZZZ"])
     return steps
 
 
-# Get how many steps would take for every node to get to
-# its first node ending with 'Z', then get the LCM
+# The walks of the ghosts don't need to reach their first end node after a whole cycle,
+# so the steps in which each walk is at an end node are combined with the CRT
 def solution_part_2(input: YieldStr) -> int:
     directions, network = parse_input(input)
     starting_nodes = [node for node in network if node.endswith("A")]
-    steps_to_end_nodes = [
-        steps_until_condition(node, lambda n: n.endswith("Z"), directions, network)
-        for node in starting_nodes
-    ]
-    steps = math.lcm(*steps_to_end_nodes)
+    end_nodes = [node for node in network if node.endswith("Z")]
+    steps = steps_to_ends(IndexedNetwork(directions, network), starting_nodes, end_nodes)
     return steps
 
 
@@ -1,10 +1,20 @@
+from itertools import islice
 from pathlib import Path
 
 import pytest
 
 from aoc.tools import read_lines_from_file
+from utils.extra_math import EventuallyPeriodic
 
-from .challenge import solution_part_1, solution_part_2
+from .challenge import (
+    IndexedNetwork,
+    JumpTables,
+    find_end_steps,
+    parse_input,
+    solution_part_1,
+    solution_part_2,
+    walk_network,
+)
 
 PARENT_PATH = Path(__file__).parent
 
@@ -15,8 +25,27 @@ PARENT_PATH = Path(__file__).parent
         (solution_part_1, PARENT_PATH / "test-input-1.txt", 2),
         (solution_part_1, PARENT_PATH / "test-input-2.txt", 6),
         (solution_part_2, PARENT_PATH / "test-input-3.txt", 6),
+        (solution_part_2, PARENT_PATH / "test-input-4.txt", 4),
     ],
 )
 def test_solution(solution, input_path, output):
     input = read_lines_from_file(input_path)
     assert solution(input) == output
+
+
+def test_find_end_steps():
+    directions, network = parse_input(read_lines_from_file(PARENT_PATH / "test-input-4.txt"))
+    indexed = IndexedNetwork(directions, network)
+    hits = indexed.pass_hits([indexed.ids["11Z"], indexed.ids["22Z"]])
+    assert find_end_steps(indexed, indexed.ids["11A"], hits) == EventuallyPeriodic((), 1, 2, (0,))
+    assert find_end_steps(indexed, indexed.ids["22A"], hits) == EventuallyPeriodic((), 1, 3, (1,))
+
+
+def test_jump_tables():
+    directions, network = parse_input(read_lines_from_file(PARENT_PATH / "test-input-3.txt"))
+    tables = JumpTables(IndexedNetwork(directions, network))
+    for start in ("11A", "22A"):
+        walk = list(islice(walk_network(start, directions, network), 50))
+        assert tables.positions_after((start, steps) for steps in range(50)) == walk
+    assert tables.position_after("22A", 10**18 + 2) == "22Z"
+    assert tables.position_after("11A", 10**18 + 1) == "11B"
@@ -5,6 +5,7 @@ from typing import ClassVar, Iterator, TypeAlias
 
 import utils.iterutils as itu
 from aoc.tools import YieldStr, run_challenge
+from aoc.tools.cache import cached_parser
 from utils import extra_math
 from utils.matrix import Direction, Point
 
@@ -40,6 +41,7 @@ class Pipe:
         return False
 
 
+@cached_parser
 def parse_input(input: YieldStr) -> tuple[TilesGrid, Point]:
     tile_grid: TilesGrid = []
     s_tile = None
@@ -3,11 +3,13 @@ from itertools import combinations
 
 import utils.iterutils as itu
 from aoc.tools import YieldStr, run_challenge
+from aoc.tools.cache import cached_parser
 from utils.matrix import Point
 
 galaxy_finder = re.compile(r"#").finditer
 
 
+@cached_parser
 def parse_input(input: YieldStr) -> tuple[list[Point], set[int], set[int]]:
     expand_columns = set[int]()
     expand_rows = set[int]()
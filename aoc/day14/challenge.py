@@ -1,93 +1,89 @@
-from collections import Counter
-from typing import Literal, Sequence, TypeAlias
+import hashlib
+from typing import Literal, TypeAlias
 
-import utils.iterutils as itu
 from aoc.tools import YieldStr, run_challenge
-from utils.matrix import transpose
+from aoc.tools.cache import cached_parser
+from utils.matrix import Grid
 
-Platform: TypeAlias = Sequence[Sequence[str]]
 TiltDirection: TypeAlias = Literal["n", "w", "s", "e"]
+SPIN_DIRECTIONS: tuple[TiltDirection, ...] = ("n", "w", "s", "e")
 
+ROUND_ROCK = b"O"
+CUBE_ROCK = b"#"
+EMPTY_SPACE = b"."
+
+
+@cached_parser
+def parse_input(input: YieldStr) -> Grid:
+    return Grid.from_lines(input)
 
-def parse_input(input: YieldStr) -> list[tuple[str, ...]]:
-    platform: list[tuple[str, ...]] = []
-    for line in input:
-        platform.append(tuple(line))
-    return platform
-
-
-def tilt_platform(platform: Platform, direction: TiltDirection) -> list[tuple[str, ...]]:
-    transformed = False
-    if direction == "n":
-        reverse = True
-        platform = transpose(platform)
-        transformed = True
-    elif direction == "s":
-        reverse = False
-        platform = transpose(platform)
-        transformed = True
-    elif direction == "w":
-        reverse = True
-    elif direction == "e":
-        reverse = False
-    else:
-        raise ValueError("direction should be one of 'nsew'")
 
-    tilted_platform: list[tuple[str, ...]] = []
-    cube_rock = "#"
+def tilt_line(line: bytes, to_start: bool) -> bytes:
+    """Rolls the round rocks of a line to its start or end, stopping at the cube rocks."""
+    tilted: list[bytes] = []
+    for segment in line.split(CUBE_ROCK):
+        rocks = ROUND_ROCK * segment.count(ROUND_ROCK)
+        space = EMPTY_SPACE * (len(segment) - len(rocks))
+        tilted.append(rocks + space if to_start else space + rocks)
+    return CUBE_ROCK.join(tilted)
 
-    for line in platform:
-        sub_sequences = itu.divide_by(cube_rock, line)
-        sub_sequences = (sorted(sub, reverse=reverse) for sub in sub_sequences)
-        tilted_column = itu.join_from_iter(sub_sequences, value=cube_rock)
-        tilted_platform.append(tuple(tilted_column))
 
-    if transformed:
-        return transpose(tilted_platform)
-    return tilted_platform
+def tilt_platform(platform: Grid, direction: TiltDirection) -> None:
+    """Tilts the platform in place, each row or column is rewritten through its view."""
+    if direction in ("n", "s"):
+        lines = platform.columns()
+    elif direction in ("w", "e"):
+        lines = platform.rows()
+    else:
+        raise ValueError("direction should be one of 'nsew'")
+
+    to_start = direction in ("n", "w")
+    for line in lines:
+        line[:] = tilt_line(line.tobytes(), to_start)
 
 
-def spin_cycle(platform: Platform) -> list[tuple[str, ...]]:
-    return tilt_platform(tilt_platform(tilt_platform(tilt_platform(platform, "n"), "w"), "s"), "e")
+def spin_cycle(platform: Grid) -> None:
+    for direction in SPIN_DIRECTIONS:
+        tilt_platform(platform, direction)
 
 
-def calculate_load(platform: Platform) -> int:
-    num_rows = len(platform)
-    round_rock = "O"
+def calculate_load(platform: Grid) -> int:
     total_load = 0
-    for i, row in enumerate(platform):
-        rounded_rocks = Counter(row).get(round_rock, 0)
-        total_load += rounded_rocks * (num_rows - i)
+    for i in range(platform.height):
+        start = platform.index(i, 0)
+        rounded_rocks = platform.cells.count(ROUND_ROCK, start, start + platform.width)
+        total_load += rounded_rocks * (platform.height - i)
     return total_load
 
 
+def platform_digest(platform: Grid) -> bytes:
+    """Compact fingerprint of the platform, so seen states don't keep whole copies around."""
+    return hashlib.blake2b(platform.cells, digest_size=16).digest()
+
+
 def solution_part_1(input: YieldStr) -> int:
     platform = parse_input(input)
-    return calculate_load(tilt_platform(platform, "n"))
+    tilt_platform(platform, "n")
+    return calculate_load(platform)
 
 
 def solution_part_2(input: YieldStr) -> int:
     platform = parse_input(input)
-    seen_states = {tuple(platform): 0}
-    num_spins = 0
+    seen_states = {platform_digest(platform): 0}
+    loads = [calculate_load(platform)]
 
     while True:
-        platform = spin_cycle(platform)
-        num_spins += 1
-        freezed_platform = tuple(platform)
-        if freezed_platform in seen_states:
+        spin_cycle(platform)
+        state = platform_digest(platform)
+        if state in seen_states:
             break
-        seen_states[freezed_platform] = num_spins
+        seen_states[state] = len(loads)
+        loads.append(calculate_load(platform))
 
     total_spins = 1_000_000_000
-    cycle_start = seen_states[freezed_platform]
-    period = num_spins - cycle_start
-    remaining_spins = (total_spins - cycle_start) % period
-
-    for _ in range(remaining_spins):
-        platform = spin_cycle(platform)
-
-    return calculate_load(platform)
+    cycle_start = seen_states[state]
+    period = len(loads) - cycle_start
+    return loads[cycle_start + (total_spins - cycle_start) % period]
 
 
 if __name__ == "__main__":
@@ -2,7 +2,7 @@ import pytest
 
 from aoc.tools import relative_test_file
 
-from .challenge import solution_part_1, solution_part_2
+from .challenge import solution_part_1, solution_part_2, tilt_line
 
 
 @pytest.mark.parametrize(
@@ -14,3 +14,16 @@ from .challenge import solution_part_1, solution_part_2
 )
 def test_solution(solution, output):
     assert solution(relative_test_file(__file__)) == output
+
+
+@pytest.mark.parametrize(
+    "line, to_start, tilted",
+    [
+        (b"O.O#..O", True, b"OO.#O.."),
+        (b"O.O#..O", False, b".OO#..O"),
+        (b"#..O#", True, b"#O..#"),
+        (b"....", False, b"...."),
+    ],
+)
+def test_tilt_line(line, to_start, tilted):
+    assert tilt_line(line, to_start) == tilted
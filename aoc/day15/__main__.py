@@ -1,6 +1,6 @@
-from aoc.tools import run_challenge
+from aoc.tools import run_solver
 
-from .challenge import read_until_comma, solution_part_1, solution_part_2
+from .challenge import SOLVERS
 
-run_challenge(solution_part_1, relative_to=__file__, reader=read_until_comma)
-run_challenge(solution_part_2, relative_to=__file__, reader=read_until_comma)
+for solver in SOLVERS:
+    run_solver(solver, relative_to=__file__)
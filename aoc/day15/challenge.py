@@ -1,23 +1,20 @@
 import re
 from typing import Iterator
 
-from aoc.tools import YieldStr, run_challenge
+from aoc.tools import READ_BUFFER_SIZE, Solver, Source, YieldStr, run_challenge
 
 
-def read_until_comma(path) -> Iterator[str]:
+def read_until_comma(path: Source) -> Iterator[str]:
+    """Yields the comma separated steps of a file, reading it in big chunks."""
+    closefd = not isinstance(path, int)
     text = ""
-    with open(path, "r", encoding="utf-8") as file:
-        while char := file.read(1):
-            if char == "\n":
-                continue
-            if char == ",":
-                if text:
-                    yield text
-                    text = ""
-                continue
-            text += char
-        if text:
-            yield text
+    with open(path, "r", encoding="utf-8", buffering=READ_BUFFER_SIZE, closefd=closefd) as file:
+        while chunk := file.read(READ_BUFFER_SIZE):
+            # The last step of a chunk may continue in the next one
+            *steps, text = (text + chunk.replace("\n", "")).split(",")
+            yield from (step for step in steps if step)
+    if text:
+        yield text
 
 
 def hash_string(string: str) -> int:
@@ -61,5 +58,11 @@ def solution_part_2(input: YieldStr) -> int:
     return total_focusing_power
 
 
+SOLVERS = (
+    Solver(solution_part_1, reader=read_until_comma),
+    Solver(solution_part_2, reader=read_until_comma),
+)
+
+
 if __name__ == "__main__":
     run_challenge(solution_part_2, __file__, read_until_comma, debug=True)
@@ -1,3 +1,5 @@
+import os
+
 import pytest
 
 from aoc.tools import relative_test_file
@@ -14,3 +16,11 @@ from .challenge import read_until_comma, solution_part_1, solution_part_2
 )
 def test_solution(solution, output):
     assert solution(relative_test_file(__file__, reader=read_until_comma)) == output
+
+
+def test_read_until_comma_stream():
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, b"rn=1,cm-,\nqp=3,,cm=2\n")
+    os.close(write_fd)
+    assert list(read_until_comma(read_fd)) == ["rn=1", "cm-", "qp=3", "cm=2"]
+    os.close(read_fd)  # The reader leaves the descriptor open
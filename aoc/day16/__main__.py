@@ -1,6 +1,6 @@
-from aoc.tools import run_challenge, run_challenge_with_path
+from aoc.tools import run_solver
 
-from .challenge import solution_part_1, solution_part_2
+from .challenge import SOLVERS
 
-run_challenge(solution_part_1, relative_to=__file__)
-run_challenge_with_path(solution_part_2, relative_to=__file__)
+for solver in SOLVERS:
+    run_solver(solver, relative_to=__file__)
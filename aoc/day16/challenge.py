@@ -1,11 +1,14 @@
 import io
-import multiprocessing
 from dataclasses import InitVar, dataclass, field
-from functools import partial, reduce
-from typing import Sequence
+from functools import reduce
+from typing import TYPE_CHECKING, Iterator, Sequence
 
-from aoc.tools import YieldStr, read_lines_from_file, run_challenge_with_path
-from utils.matrix import Direction, Point
+from aoc.tools import Solver, YieldStr, read_lines_from_file, run_challenge
+from aoc.tools.cache import cached_parser
+from utils.matrix import Direction, Grid, Point
+
+if TYPE_CHECKING:
+    from multiprocessing.shared_memory import SharedMemory
 
 
 class Tile:
@@ -189,48 +192,292 @@ class Contraption:
         return NotImplemented
 
 
-def generate_all_configurations(num_rows: int, num_columns: int) -> list[Beam]:
-    beams: list[Beam] = []
-
-    for row in range(num_rows):
-        from_left = Beam(Point(row, -1), Direction.RIGHT)
-        from_right = Beam(Point(row, num_columns), Direction.LEFT)
-        beams.extend((from_left, from_right))
+# Indices of the directions in `Direction` order, as used by `Grid.neighbour_table`
+UP, RIGHT, DOWN, LEFT = range(4)
+MIRROR_SLASH = ord("/")
+MIRROR_BACKSLASH = ord("\\")
+SPLITTER_VERTICAL = ord("|")
+SPLITTER_HORIZONTAL = ord("-")
+NO_SPLITTER = -1
+
+
+def _to_bitset(cells: Iterator[int], size: int) -> int:
+    bits = bytearray((size + 7) // 8)
+    for cell in cells:
+        bits[cell >> 3] |= 1 << (cell & 7)
+    return int.from_bytes(bits, "little")
+
+
+class BeamGraph:
+    """
+    Beam propagation precomputed as a graph between splitters.
+
+    A splitter hit from the side always sends the same two beams, no matter where the beam
+    came from. Each of those beams is traced once, until it leaves the grid or hits the side
+    of another splitter, and the tiles it crosses are kept as a bitset. The tiles energized
+    by a splitter are then its own bitset joined with the ones of every splitter it reaches,
+    computed once per strongly connected component, so all starting beams share the work.
+    """
+
+    def __init__(self, layout: Grid) -> None:
+        self.layout = layout
+        self._neighbours = layout.neighbour_table()
+        self._energized: dict[int, int] = {}
+
+        successors: dict[int, list[int]] = {}
+        own_tiles: dict[int, int] = {}
+        for splitter, tile in enumerate(layout.cells):
+            if tile not in (SPLITTER_VERTICAL, SPLITTER_HORIZONTAL):
+                continue
+            outputs = (UP, DOWN) if tile == SPLITTER_VERTICAL else (RIGHT, LEFT)
+            tiles = 1 << splitter
+            successors[splitter] = []
+            for direction in outputs:
+                start = self._neighbours[splitter * 4 + direction]
+                if start < 0:
+                    continue
+                segment, hit = self.trace(start, direction)
+                tiles |= segment
+                if hit != NO_SPLITTER:
+                    successors[splitter].append(hit)
+            own_tiles[splitter] = tiles
+
+        for component in strongly_connected_components(successors):
+            tiles = 0
+            for splitter in component:
+                tiles |= own_tiles[splitter]
+                for successor in successors[splitter]:
+                    tiles |= self._energized.get(successor, 0)
+            for splitter in component:
+                self._energized[splitter] = tiles
+
+    def trace(self, cell: int, direction: int) -> tuple[int, int]:
+        """
+        Follows a beam entering `cell` towards `direction`. Returns the bitset of the tiles
+        crossed and the splitter that stopped the beam, or `NO_SPLITTER` if it left the grid.
+        """
+        cells = self.layout.cells
+        neighbours = self._neighbours
+        crossed: list[int] = []
+        # Only beams passing straight through a splitter can go around in a loop
+        passed: set[int] = set()
+
+        while cell >= 0:
+            crossed.append(cell)
+            tile = cells[cell]
+            if tile == MIRROR_SLASH:
+                direction ^= 1
+            elif tile == MIRROR_BACKSLASH:
+                direction = 3 - direction
+            elif tile in (SPLITTER_VERTICAL, SPLITTER_HORIZONTAL):
+                if (tile == SPLITTER_VERTICAL) == (direction & 1 == 1):
+                    return _to_bitset(iter(crossed), len(cells)), cell
+                state = cell * 4 + direction
+                if state in passed:
+                    break
+                passed.add(state)
+            cell = neighbours[cell * 4 + direction]
+
+        return _to_bitset(iter(crossed), len(cells)), NO_SPLITTER
+
+    def energized_tiles(self, cell: int, direction: int) -> int:
+        """Bitset of the tiles energized by a beam entering `cell` towards `direction`."""
+        tiles, splitter = self.trace(cell, direction)
+        if splitter != NO_SPLITTER:
+            tiles |= self._energized[splitter]
+        return tiles
+
+    def count_energized(self, cell: int, direction: int) -> int:
+        return self.energized_tiles(cell, direction).bit_count()
+
+
+def edge_beams(layout: Grid) -> Iterator[tuple[int, int]]:
+    """Cell and direction of every beam entering the grid from one of its edges."""
+    width, height = layout.width, layout.height
+    for row in range(height):
+        yield layout.index(row, 0), RIGHT
+        yield layout.index(row, width - 1), LEFT
+    for column in range(width):
+        yield layout.index(0, column), DOWN
+        yield layout.index(height - 1, column), UP
+
+
+def simulate_beam(
+    cells: bytearray | memoryview,
+    neighbours: Sequence[int],
+    cell: int,
+    direction: int,
+) -> int:
+    """
+    Counts the tiles energized by a beam entering `cell` towards `direction`, moving the
+    beams one tile at a time. `neighbours` is the `Grid.neighbour_table` of the layout.
+    """
+    visited = bytearray(4 * len(cells))
+    energized = bytearray(len(cells))
+    beams = [(cell, direction)]
+
+    while beams:
+        cell, direction = beams.pop()
+        while cell >= 0:
+            state = cell * 4 + direction
+            if visited[state]:
+                break
+            visited[state] = 1
+            energized[cell] = 1
+            tile = cells[cell]
+            if tile == MIRROR_SLASH:
+                direction ^= 1
+            elif tile == MIRROR_BACKSLASH:
+                direction = 3 - direction
+            elif tile == SPLITTER_VERTICAL and direction & 1:
+                direction = UP
+                beams.append((neighbours[cell * 4 + DOWN], DOWN))
+            elif tile == SPLITTER_HORIZONTAL and not direction & 1:
+                direction = RIGHT
+                beams.append((neighbours[cell * 4 + LEFT], LEFT))
+            cell = neighbours[cell * 4 + direction]
+
+    return energized.count(1)
+
+
+def strongly_connected_components(graph: dict[int, list[int]]) -> list[list[int]]:
+    """
+    Tarjan's algorithm without recursion. Components are returned in reverse topological
+    order, so the successors of a component always come before it.
+    """
+    index: dict[int, int] = {}
+    low_link: dict[int, int] = {}
+    stack: list[int] = []
+    on_stack: set[int] = set()
+    components: list[list[int]] = []
+
+    for root in graph:
+        if root in index:
+            continue
+        work = [(root, iter(graph[root]))]
+        index[root] = low_link[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor not in index:
+                    index[successor] = low_link[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(graph[successor])))
+                    break
+                if successor in on_stack:
+                    low_link[node] = min(low_link[node], index[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low_link[parent] = min(low_link[parent], low_link[node])
+                if low_link[node] == index[node]:
+                    components.append(_pop_component(stack, on_stack, node))
+
+    return components
+
+
+def _pop_component(stack: list[int], on_stack: set[int], root: int) -> list[int]:
+    """Pops the nodes of the component of `root`, which are above it in the stack."""
+    component: list[int] = []
+    while True:
+        member = stack.pop()
+        on_stack.remove(member)
+        component.append(member)
+        if member == root:
+            return component
+
+
+@cached_parser
+def parse_input(input: YieldStr) -> Grid:
+    return Grid.from_lines(input)
 
-    for column in range(num_columns):
-        from_above = Beam(Point(-1, column), Direction.DOWN)
-        from_below = Beam(Point(num_rows, column), Direction.UP)
-        beams.extend((from_above, from_below))
 
-    return beams
+def solution_part_1(input: YieldStr) -> int:
+    graph = BeamGraph(parse_input(input))
+    return graph.count_energized(0, RIGHT)
 
 
-def process_simulation(initial_beam: Beam, path: str) -> int:
-    input = read_lines_from_file(path)
-    contraption = Contraption.from_input(input, initial_beam)
-    contraption.init_simulation()
-    return contraption.count_energized_tiles()
+def solution_part_2(input: YieldStr) -> int:
+    graph = BeamGraph(parse_input(input))
+    beams = edge_beams(graph.layout)
+    return max(graph.count_energized(cell, direction) for cell, direction in beams)
 
 
-def solution_part_1(input: YieldStr) -> int:
+def solution_part_1_simulated(input: YieldStr) -> int:
+    """Reference solution that moves every beam tile by tile."""
     contraption = Contraption.from_input(input)
     contraption.init_simulation()
     count = contraption.count_energized_tiles()
     return count
 
 
-def solution_part_2(file_path: str) -> int:
-    num_rows = 0
-    num_columns = 0
-    for row, line in enumerate(read_lines_from_file(file_path), 1):
-        num_rows = row
-        num_columns = len(line)
-    configurations = generate_all_configurations(num_rows, num_columns)
+# Layout shared with the pool workers, set by `_attach_layout` in each worker
+_shared_layout: "tuple[SharedMemory, memoryview, memoryview] | None" = None
+
+
+def _table_offset(size: int) -> int:
+    # The neighbour table is stored after the cells, aligned to its 8 byte items
+    return (size + 7) // 8 * 8
+
+
+def _attach_layout(name: str, size: int) -> None:
+    from multiprocessing.shared_memory import SharedMemory  # pylint: disable=C0415
+
+    global _shared_layout  # pylint: disable=W0603
+    memory = SharedMemory(name)
+    buf = memory.buf
+    assert buf is not None
+    offset = _table_offset(size)
+    neighbours = buf[offset : offset + 4 * size * 8].cast("q")
+    _shared_layout = memory, buf[:size], neighbours
+
+
+def _simulate_shared(beam: tuple[int, int]) -> int:
+    assert _shared_layout is not None
+    _, cells, neighbours = _shared_layout
+    return simulate_beam(cells, neighbours, *beam)
+
+
+def solution_part_2_simulated(file_path: str) -> int:
+    """
+    Reference solution that simulates every starting beam in a process pool. The layout and
+    its neighbour table are written once to shared memory, which the workers read in place.
+    """
+    import multiprocessing  # pylint: disable=C0415
+    from multiprocessing.shared_memory import SharedMemory  # pylint: disable=C0415
+
+    layout = parse_input(read_lines_from_file(file_path))
+    table = layout.neighbour_table().tobytes()
+    size = len(layout.cells)
+    offset = _table_offset(size)
+
+    memory = SharedMemory(create=True, size=offset + len(table))
+    try:
+        buf = memory.buf
+        assert buf is not None
+        buf[:size] = layout.cells
+        buf[offset : offset + len(table)] = table
+        beams = list(edge_beams(layout))
+        workers = multiprocessing.cpu_count()
+        # A few chunks per worker balance the load without paying the overhead of every task
+        chunksize = max(1, len(beams) // (workers * 4))
+        with multiprocessing.Pool(workers, _attach_layout, (memory.name, size)) as pool:
+            return max(pool.imap_unordered(_simulate_shared, beams, chunksize))
+    finally:
+        memory.close()
+        memory.unlink()
+
 
-    with multiprocessing.Pool() as pool:
-        results = pool.map(partial(process_simulation, path=file_path), configurations)
-    return max(results)
+SOLVERS = (
+    Solver(solution_part_1),
+    Solver(solution_part_2),
+)
 
 
 if __name__ == "__main__":
-    run_challenge_with_path(solution_part_2, __file__, debug=True)
+    run_challenge(solution_part_2, __file__, debug=True)
@@ -1,19 +1,22 @@
 import re
-from typing import Iterator
 
 from aoc.tools import YieldStr, run_challenge
+from aoc.tools.cache import cached_parser
 from utils import extra_math as xmath
 from utils.matrix import Direction, Point
 
 CHAR_TO_DIRECTION = {direct.name[0].upper(): direct for direct in Direction}
 
 
-def parse_input(input: YieldStr) -> Iterator[tuple[str, int, str]]:
+@cached_parser
+def parse_input(input: YieldStr) -> list[tuple[str, int, str]]:
     parse_line = re.compile(r"([UDRL]) (\d+) \(#([0-9A-Fa-f]{6})\)")
+    instructions: list[tuple[str, int, str]] = []
     for line in input:
         match = parse_line.match(line)
         assert match is not None
-        yield match[1], int(match[2]), match[3]
+        instructions.append((match[1], int(match[2]), match[3]))
+    return instructions
 
 
 def solution_part_1(input: YieldStr) -> int:
@@ -1,22 +1,47 @@
 import enum
 import logging
+import os
 import re
+import sys
 from abc import ABC, abstractmethod
+from array import array
 from collections import deque
 from dataclasses import InitVar, dataclass, field
-from functools import reduce
-from pathlib import Path
-from typing import Callable, ClassVar, Iterable, NamedTuple, Self
+from functools import partial
+from itertools import product
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    ClassVar,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Self,
+    Sequence,
+    TypeAlias,
+)
 
 from aoc.tools import YieldStr, run_challenge
+from aoc.tools.cache import cached_parser
+from utils.extra_math import EventuallyPeriodic, first_common_value
+
+if TYPE_CHECKING:
+    from _typeshed import StrPath
+
+logger = logging.getLogger(__name__)
+
+MAX_PRESSES = 1_000_000
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    filename=Path(__file__).with_name("output-log.txt"),
-    filemode="w",
-    encoding="utf-8",
-    format="%(levelname)s: %(message)s",
-)
+
+def configure_debug_log() -> None:
+    """Writes the debug messages to output-log.txt, next to this file."""
+    logging.basicConfig(
+        level=logging.DEBUG,
+        filename=os.path.join(os.path.dirname(__file__), "output-log.txt"),
+        filemode="w",
+        encoding="utf-8",
+        format="%(levelname)s: %(message)s",
+    )
 
 
 class Bit(enum.IntEnum):
@@ -166,7 +191,7 @@ class ModuleComunicator:
             for dest_module_name in module.destination_modules:
                 dest_module = self.modules.get(dest_module_name)
                 if dest_module is None:
-                    logging.debug(
+                    logger.debug(
                         "Module with name '%s' doesn't exist, creating %s.",
                         dest_module_name,
                         EndModule.__name__,
@@ -212,6 +237,251 @@ class ModuleComunicator:
             self.pulses_queue.extend(next_pulses)
 
 
+# The compiled network is a set of flat tables plus the simulation state, hence the attributes
+class PulseNetwork:  # pylint: disable=R0902
+    """
+    Compiled version of `ModuleComunicator`, modules are numbered and each pulse is a single
+    int `edge * 2 + bit`, queued in a list reused by every press and grown when it fills up.
+    Flip-flop states are the bits of one int, and each conjunction remembers its high inputs
+    as a bitmask.
+    """
+
+    BUTTON = "button"
+    END, FLIP_FLOP, CONJUNCTION, BROADCASTER = range(4)
+
+    def __init__(self, modules: Iterable[Module]) -> None:
+        modules = list(modules)
+        self.names: list[str] = [self.BUTTON]
+        self.ids: dict[str, int] = {self.BUTTON: 0}
+        for module in modules:
+            self._add_name(module.name)
+        for module in modules:
+            for destination in module.destination_modules:
+                self._add_name(destination)
+
+        self.kinds = bytearray(len(self.names))
+        for module in modules:
+            if isinstance(module, FlipFlop):
+                self.kinds[self.ids[module.name]] = self.FLIP_FLOP
+            elif isinstance(module, Conjunction):
+                self.kinds[self.ids[module.name]] = self.CONJUNCTION
+            elif isinstance(module, Broadcaster):
+                self.kinds[self.ids[module.name]] = self.BROADCASTER
+
+        # Edge 0 is the button pressing the broadcaster
+        self.edge_source = [0]
+        self.edge_destination = [self.ids[Broadcaster.NAME]]
+        self.edge_mask = [0]
+        self.out_edges: list[tuple[int, ...]] = [()] * len(self.names)
+        self.out_edges[0] = (0,)
+        self.full_mask = [0] * len(self.names)
+        input_masks: dict[tuple[int, int], int] = {}
+        for module in modules:
+            source = self.ids[module.name]
+            edges: list[int] = []
+            for destination in module.destination_modules:
+                target = self.ids[destination]
+                mask = 0
+                if self.kinds[target] == self.CONJUNCTION:
+                    if (source, target) not in input_masks:
+                        input_masks[source, target] = self.full_mask[target] + 1
+                        self.full_mask[target] |= input_masks[source, target]
+                    mask = input_masks[source, target]
+                edges.append(len(self.edge_source))
+                self.edge_source.append(source)
+                self.edge_destination.append(target)
+                self.edge_mask.append(mask)
+            self.out_edges[source] = tuple(edges)
+
+        # Encoded pulses sent by each module, for a low and a high output
+        self._out_pulses = [
+            (tuple(edge * 2 for edge in edges), tuple(edge * 2 + 1 for edge in edges))
+            for edges in self.out_edges
+        ]
+        self._pulses = [0] * 64
+        self._pulses_sent = 0
+        self.flip_flops = 0
+        self.memory = [0] * len(self.names)
+        self.low_pulses = 0
+        self.high_pulses = 0
+        self.low_received = [0] * len(self.names)
+
+    def _add_name(self, name: str) -> None:
+        if name not in self.ids:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+
+    def state(self) -> tuple[int, tuple[int, ...]]:
+        """Hashable snapshot of the flip-flops and conjunction memories."""
+        return self.flip_flops, tuple(self.memory)
+
+    # The whole press runs in one loop over local variables, as calls and attribute lookups
+    # would dominate the time of each pulse
+    def push_button(self, watch: int = -1) -> int:  # pylint: disable=R0912,R0914
+        """
+        Sends a low pulse to the broadcaster and processes pulses until there are none left.
+        Returns a bitmask, by module id, of the modules that sent a high pulse to `watch`.
+        """
+        flip_flop, conjunction, broadcaster = self.FLIP_FLOP, self.CONJUNCTION, self.BROADCASTER
+        kinds, out_pulses = self.kinds, self._out_pulses
+        edge_source, edge_destination, edge_mask = (
+            self.edge_source,
+            self.edge_destination,
+            self.edge_mask,
+        )
+        memory, full_mask, low_received = self.memory, self.full_mask, self.low_received
+        flip_flops = self.flip_flops
+        # Pulses are queued in order in a buffer reused by every press, grown when it fills up
+        pulses = self._pulses
+        pulses[0] = 0
+        head, tail = 0, 1
+        low, high = 1, 0
+        high_senders = 0
+
+        while head < tail:
+            pulse = pulses[head]
+            head += 1
+            edge = pulse >> 1
+            destination = edge_destination[edge]
+            if destination == watch and pulse & 1:
+                high_senders |= 1 << edge_source[edge]
+
+            kind = kinds[destination]
+            if kind == flip_flop:
+                if pulse & 1:
+                    continue
+                flip_flops ^= 1 << destination
+                bit = (flip_flops >> destination) & 1
+            elif kind == conjunction:
+                if pulse & 1:
+                    memory[destination] |= edge_mask[edge]
+                else:
+                    memory[destination] &= ~edge_mask[edge]
+                bit = 0 if memory[destination] == full_mask[destination] else 1
+            elif kind == broadcaster:
+                bit = pulse & 1
+            else:
+                if not pulse & 1:
+                    low_received[destination] += 1
+                continue
+
+            sent = out_pulses[destination][bit]
+            if tail + len(sent) > len(pulses):
+                pulses.extend([0] * (len(pulses) + len(sent)))
+            pulses[tail : tail + len(sent)] = sent
+            tail += len(sent)
+            if bit:
+                high += len(sent)
+            else:
+                low += len(sent)
+
+        self.flip_flops = flip_flops
+        self.low_pulses += low
+        self.high_pulses += high
+        self._pulses_sent = tail
+        return high_senders
+
+    def last_pulses(self) -> Iterator[tuple[int, int, int]]:
+        """Sender id, destination id and bit of every pulse of the last press, in order."""
+        for pulse in self._pulses[: self._pulses_sent]:
+            edge = pulse >> 1
+            yield self.edge_source[edge], self.edge_destination[edge], pulse & 1
+
+    def last_pulse_origins(self) -> list[tuple[int, int]]:
+        """
+        Depth of every pulse of the last press (how many pulses led to it from the button)
+        and the id of the module the broadcaster sent its first ancestor to, in order.
+        Pulses are processed by depth, and pulses of the same depth in the order of their
+        ancestors, so this places a pulse among the pulses of any other network fed by
+        the same broadcaster.
+        """
+        pulses = self._pulses[: self._pulses_sent]
+        origins = [(0, -1)] * len(pulses)
+        tail = 1
+        for head, pulse in enumerate(pulses):
+            destination = self.edge_destination[pulse >> 1]
+            kind = self.kinds[destination]
+            if kind == self.END or (kind == self.FLIP_FLOP and pulse & 1):
+                continue  # It didn't send pulses
+            depth, root = origins[head]
+            for child in range(tail, tail + len(self.out_edges[destination])):
+                child_root = self.edge_destination[pulses[child] >> 1] if head == 0 else root
+                origins[child] = depth + 1, child_root
+            tail += len(self.out_edges[destination])
+        return origins
+
+
+class TraceRecorder:
+    """
+    Opt-in record of the pulses of a `PulseNetwork`, as (press, sender, destination, bit)
+    integers in a preallocated array. Pulses are read back from the network after each
+    press, so the simulation itself does no extra work.
+    """
+
+    FIELDS = 4
+    MAGIC = b"AOC20TRC"
+
+    def __init__(self, network: PulseNetwork, capacity: int = 1 << 16) -> None:
+        self.names = network.names
+        self.records = array("I", bytes(4 * self.FIELDS * capacity))
+        self.length = 0
+        self._network = network
+
+    def __len__(self) -> int:
+        return self.length
+
+    def record_press(self, press: int) -> None:
+        records, end = self.records, self.length * self.FIELDS
+        for sender, destination, bit in self._network.last_pulses():
+            if end == len(records):
+                records.frombytes(bytes(records.itemsize * len(records)))  # Double the size
+            records[end] = press
+            records[end + 1] = sender
+            records[end + 2] = destination
+            records[end + 3] = bit
+            end += self.FIELDS
+        self.length = end // self.FIELDS
+
+    def __iter__(self) -> Iterator[tuple[int, int, int, int]]:
+        records = self.records
+        for start in range(0, self.length * self.FIELDS, self.FIELDS):
+            yield records[start], records[start + 1], records[start + 2], records[start + 3]
+
+    def format_record(self, record: tuple[int, int, int, int]) -> str:
+        press, sender, destination, bit = record
+        return f"{press}: {self.names[sender]} -{Bit(bit).name}-> {self.names[destination]}"
+
+    def dump(self, path: "StrPath") -> None:
+        """
+        Writes the module names and the records to a binary file: the magic bytes, the size of
+        the names, the names separated by new lines and then the records as uint32 values.
+        """
+        names = "\n".join(self.names).encode()
+        with open(path, "wb") as file:
+            file.write(self.MAGIC)
+            file.write(len(names).to_bytes(4, "little"))
+            file.write(names)
+            records = self.records[: self.length * self.FIELDS]
+            if sys.byteorder != "little":
+                records.byteswap()
+            records.tofile(file)
+
+    @classmethod
+    def load(cls, path: "StrPath") -> tuple[list[str], list[tuple[int, int, int, int]]]:
+        """Reads the module names and the records written by `dump`."""
+        with open(path, "rb") as file:
+            if file.read(len(cls.MAGIC)) != cls.MAGIC:
+                raise ValueError(f"{path} is not a pulse trace")
+            names = file.read(int.from_bytes(file.read(4), "little")).decode().split("\n")
+            records = array("I")
+            records.frombytes(file.read())
+        if sys.byteorder != "little":
+            records.byteswap()
+        fields = [records[i :: cls.FIELDS] for i in range(cls.FIELDS)]
+        return names, list(zip(*fields))  # type: ignore
+
+
+@cached_parser
 def parse_input(input: YieldStr) -> list[Module]:
     modules: list[Module] = []
     for line in input:
@@ -229,46 +499,206 @@ def parse_input(input: YieldStr) -> list[Module]:
     return modules
 
 
-def solution_part_1(input: YieldStr) -> int:
-    modules = parse_input(input)
-    modcom = ModuleComunicator(modules)
-    for _ in range(1000):
-        modcom.push_button()
-    return modcom.total_high_pulses * modcom.total_low_pulses
-
-
-# This solution is dependent of the input
-# Find the single module that outputs to 'rx' (Should be a conjuction module)
-# and check how many button presses takes to all its inputs to deliver a
-# high pulse to the conjuction. Multiply the number of presses for all the module
-# to get the answer
-def solution_part_2(input: YieldStr) -> int:
-    modules = parse_input(input)
-    module_comunicator = ModuleComunicator(modules)
-
-    output_to_rx = None
+def solution_part_1(input: YieldStr, trace_file: "StrPath | None" = None) -> int:
+    network = PulseNetwork(parse_input(input))
+    if trace_file is None:
+        for _ in range(1000):
+            network.push_button()
+    else:
+        trace = TraceRecorder(network)
+        for press in range(1, 1001):
+            network.push_button()
+            trace.record_press(press)
+        trace.dump(trace_file)
+    return network.high_pulses * network.low_pulses
+
+
+# When a pulse is processed: its depth, the position among the broadcaster destinations of
+# the module its first ancestor was sent to, and its position in its own network
+PulseTime: TypeAlias = tuple[int, int, int]
+
+
+class HighPresses(NamedTuple):
+    """
+    Presses in which a module sends a high pulse to a conjunction, and for each of those
+    presses the windows of time in which the conjunction remembers the module as high.
+    """
+
+    presses: EventuallyPeriodic
+    windows: dict[int, list[tuple[PulseTime, PulseTime]]]
+
+
+def high_windows(
+    network: PulseNetwork,
+    sender: int,
+    destination: int,
+    root_order: dict[str, int],
+) -> list[tuple[PulseTime, PulseTime]]:
+    """Windows of the last press in which `sender`'s last pulse to `destination` is high."""
+    origins = network.last_pulse_origins()
+    windows: list[tuple[PulseTime, PulseTime]] = []
+    high_since: PulseTime | None = None
+    for i, (source, target, bit) in enumerate(network.last_pulses()):
+        if source != sender or target != destination:
+            continue
+        depth, root = origins[i]
+        time = depth, root_order[network.names[root]], i
+        if bit and high_since is None:
+            high_since = time
+        elif not bit and high_since is not None:
+            windows.append((high_since, time))
+            high_since = None
+    return windows
+
+
+def find_high_presses(
+    network: PulseNetwork,
+    sender: str,
+    destination: str,
+    root_order: dict[str, int],
+    max_presses: int = MAX_PRESSES,
+) -> HighPresses | None:
+    """
+    Presses the button until the network state repeats, noting the presses in which `sender`
+    sends a high pulse to the `destination` conjunction. Returns None if `sender` ends a press
+    with a high pulse, as then the presses alone don't tell when the conjunction sees all
+    inputs high. `root_order` is the position of each broadcaster destination.
+    """
+    watch = network.ids[destination]
+    sender_id = network.ids[sender]
+    seen_states = {network.state(): 0}
+    presses: list[int] = []
+    windows: dict[int, list[tuple[PulseTime, PulseTime]]] = {}
+
+    for press in range(1, max_presses + 1):
+        if network.push_button(watch) & (1 << sender_id):
+            presses.append(press)
+            windows[press] = high_windows(network, sender_id, watch, root_order)
+        if network.memory[watch]:
+            return None
+        state = network.state()
+        if state in seen_states:
+            # The presses after the first time the state was seen repeat
+            start = seen_states[state] + 1
+            return HighPresses(
+                EventuallyPeriodic.from_values(presses, start, press + 1 - start), windows
+            )
+        seen_states[state] = press
+    raise ValueError(f"The network state doesn't repeat within {max_presses} presses")
+
+
+def all_high_at_once(
+    high_presses: Sequence[HighPresses],
+    presses: tuple[int, ...],
+) -> bool:
+    """
+    Whether the conjunction sees all its inputs high at some point, given a press of each
+    input with the same windows as the press checked.
+    """
+    windows = (high.windows[press] for high, press in zip(high_presses, presses))
+    return any(
+        max(start for start, _ in choice) < min(end for _, end in choice)
+        for choice in product(*windows)
+    )
+
+
+def find_sub_networks(
+    modules: Sequence[Module],
+    feeder: str,
+) -> dict[str, list[Module]] | None:
+    """
+    Splits the modules that feed `feeder` into one network per input of `feeder`, made of
+    the input and every module upstream of it. Returns None if the networks share modules.
+    """
+    by_name = {module.name: module for module in modules}
+    inputs: dict[str, list[str]] = {}
     for module in modules:
-        if "rx" in module.destination_modules:
-            output_to_rx = module
-            break
-    assert isinstance(output_to_rx, Conjunction)
-    logging.debug(output_to_rx)
-
-    input_modules: dict[str, int] = {}
-
-    def callback(pulse: Pulse):
-        nonlocal input_modules
-        if pulse.destination == output_to_rx.name and pulse.bit is Bit.ON:
-            logging.debug(pulse)
-            input_modules.setdefault(pulse.sender, number_presses)
-
-    for number_presses in range(1, 20_001):
-        logging.debug("Press number %s", number_presses)
-        module_comunicator.push_button(callback)
-        if len(input_modules) == len(output_to_rx.input_modules):
-            break
-    return reduce(lambda acc, v: acc * v, input_modules.values())
+        for destination in module.destination_modules:
+            inputs.setdefault(destination, []).append(module.name)
+
+    sub_networks: dict[str, list[Module]] = {}
+    claimed: set[str] = set()
+    for feeder_input in inputs.get(feeder, []):
+        if feeder_input == Broadcaster.NAME:
+            return None
+        upstream = {feeder_input}
+        pending = [feeder_input]
+        while pending:
+            for name in inputs.get(pending.pop(), []):
+                if name not in upstream and name != Broadcaster.NAME:
+                    upstream.add(name)
+                    pending.append(name)
+        if feeder in upstream or not upstream.isdisjoint(claimed):
+            return None
+        claimed |= upstream
+
+        broadcaster = by_name[Broadcaster.NAME]
+        destinations = [name for name in broadcaster.destination_modules if name in upstream]
+        sub_network: list[Module] = [Broadcaster(destinations), by_name[feeder]]
+        sub_network.extend(by_name[name] for name in upstream if name in by_name)
+        sub_networks[feeder_input] = sub_network
+    return sub_networks
+
+
+def presses_until_low_pulse(
+    network: PulseNetwork,
+    destination: str,
+    max_presses: int = MAX_PRESSES,
+) -> int:
+    """Simulates the whole network until `destination` gets a low pulse."""
+    if destination not in network.ids:
+        raise ValueError(f"There is no '{destination}' module")
+    target = network.ids[destination]
+    seen_states = {network.state()}
+    for press in range(1, max_presses + 1):
+        network.push_button()
+        if network.low_received[target]:
+            return press
+        state = network.state()
+        if state in seen_states:
+            raise ValueError(f"'{destination}' never receives a low pulse")
+        seen_states.add(state)
+    raise ValueError(f"'{destination}' doesn't receive a low pulse within {max_presses} presses")
+
+
+# The module sending to 'rx' is usually a conjuction fed by independent counters, each
+# sending it a high pulse periodically. Each counter is simulated on its own until its state
+# repeats, and the presses in which all of them send a high pulse are combined with the CRT.
+# If the modules don't have that shape, the whole network is simulated instead.
+def solution_part_2(input: YieldStr, max_presses: int = MAX_PRESSES) -> int:
+    modules = parse_input(input)
+    feeders = [module for module in modules if "rx" in module.destination_modules]
+    sub_networks = None
+    if len(feeders) == 1 and isinstance(feeders[0], Conjunction):
+        sub_networks = find_sub_networks(modules, feeders[0].name)
+
+    if not sub_networks:
+        logger.debug("Simulating the whole network")
+        return presses_until_low_pulse(PulseNetwork(modules), "rx", max_presses)
+
+    feeder = feeders[0]
+    broadcaster = next(module for module in modules if isinstance(module, Broadcaster))
+    root_order = {name: i for i, name in enumerate(broadcaster.destination_modules)}
+    high_presses: list[HighPresses] = []
+    for sender, sub_network in sub_networks.items():
+        network = PulseNetwork(sub_network)
+        presses = find_high_presses(network, sender, feeder.name, root_order, max_presses)
+        logger.debug("%s -high-> %s: %s", sender, feeder.name, presses)
+        if presses is None:
+            logger.debug("Simulating the whole network")
+            return presses_until_low_pulse(PulseNetwork(modules), "rx", max_presses)
+        high_presses.append(presses)
+
+    # Inputs sending high pulses in the same press may still not be high at the same time
+    press = first_common_value(
+        [high.presses for high in high_presses],
+        accept=partial(all_high_at_once, high_presses),
+    )
+    if press is None:
+        raise ValueError("'rx' never receives a low pulse")
+    return press
 
 
 if __name__ == "__main__":
+    configure_debug_log()
     run_challenge(solution_part_2, __file__, debug=True)
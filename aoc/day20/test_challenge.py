@@ -2,7 +2,15 @@ import pytest
 
 from aoc.tools import relative_test_file
 
-from .challenge import solution_part_1
+from .challenge import (
+    ModuleComunicator,
+    PulseNetwork,
+    TraceRecorder,
+    parse_input,
+    presses_until_low_pulse,
+    solution_part_1,
+    solution_part_2,
+)
 
 
 @pytest.mark.parametrize(
@@ -10,7 +18,50 @@ from .challenge import solution_part_1
     [
         (solution_part_1, 32_000_000, "test-input-1.txt"),
         (solution_part_1, 11_687_500, "test-input-2.txt"),
+        (solution_part_2, 315, "test-input-3.txt"),
+        (solution_part_2, 2, "test-input-4.txt"),
     ],
 )
 def test_solution(solution, output, file_name):
     assert solution(relative_test_file(__file__, name=file_name)) == output
+
+
+def test_inputs_high_at_different_times():
+    # 'ia' and 'ib' send high pulses in the same presses, but the inverter chain delays 'ib'
+    # until after 'ia' has gone low again, so 'fin' never sees both of them high
+    with pytest.raises(ValueError, match="never receives a low pulse"):
+        solution_part_2(relative_test_file(__file__, name="test-input-5.txt"))
+    network = PulseNetwork(parse_input(relative_test_file(__file__, name="test-input-5.txt")))
+    with pytest.raises(ValueError, match="never receives a low pulse"):
+        presses_until_low_pulse(network, "rx")
+
+
+@pytest.mark.parametrize("file_name", ["test-input-1.txt", "test-input-2.txt"])
+def test_compiled_network(file_name):
+    network = PulseNetwork(parse_input(relative_test_file(__file__, name=file_name)))
+    communicator = ModuleComunicator(parse_input(relative_test_file(__file__, name=file_name)))
+    for _ in range(1000):
+        network.push_button()
+        communicator.push_button()
+        assert network.low_pulses == communicator.total_low_pulses
+        assert network.high_pulses == communicator.total_high_pulses
+
+
+def test_trace_recorder(tmp_path):
+    trace_file = tmp_path / "trace.bin"
+    input = relative_test_file(__file__, name="test-input-1.txt")
+    assert solution_part_1(input, trace_file=trace_file) == 32_000_000
+
+    names, records = TraceRecorder.load(trace_file)
+    assert names == ["button", "broadcaster", "a", "b", "c", "inv"]
+    assert len(records) == 8000 + 4000
+    assert records[:3] == [(1, 0, 1, 0), (1, 1, 2, 0), (1, 1, 3, 0)]
+    assert records[-1] == (1000, 5, 2, 1)
+
+    network = PulseNetwork(parse_input(relative_test_file(__file__, name="test-input-1.txt")))
+    trace = TraceRecorder(network, capacity=1)
+    network.push_button()
+    trace.record_press(1)
+    assert len(trace) == 12
+    assert len(trace.records) == 16 * TraceRecorder.FIELDS  # Doubled from one record
+    assert trace.format_record(next(iter(trace))) == "1: button -OFF-> broadcaster"
@@ -1,55 +1,142 @@
+from array import array
 from functools import partial
-from typing import Iterator, Sequence
+from typing import Iterable
 
-from aoc.tools import YieldStr, run_challenge
-from utils.iterutils import get_index
-from utils.matrix import Direction, Point
+from aoc.tools import Solver, YieldStr, run_challenge
+from aoc.tools.cache import cached_parser
+from utils.matrix import Grid
 
-Garden = Sequence[str]
+ROCK = ord("#")
+# Counts of reachable plots sampled for part 2, the last second differences must match
+MIN_SAMPLES = 5
+MAX_SAMPLES = 40
+STABLE_DIFFERENCES = 3
 
 
-def parse_input(input: YieldStr) -> tuple[Garden, Point]:
-    garden: list[str] = []
-    starting_position = None
-    for row, line in enumerate(input):
-        if (column := get_index(line, "S")) is not None:
-            starting_position = Point(row, column)
-            line = line.replace("S", ".")
-        garden.append(line)
-    assert starting_position is not None
+@cached_parser
+def parse_input(input: YieldStr) -> tuple[Grid, int]:
+    garden = Grid.from_lines(input)
+    starting_position = garden.find("S")
+    garden[starting_position] = "."
     return garden, starting_position
 
 
-def posible_steps(garden: Garden, position: Point) -> Iterator[Point]:
-    row_limits = range(len(garden))
-    column_limits = range(len(garden[0]))
-    for direction in Direction:
-        next_step = position + direction
-        if not (next_step.row in row_limits and next_step.column in column_limits):
-            continue
-        tile = garden[next_step.row][next_step.column]
-        if tile == "#":
-            continue
-        yield next_step
+class DistanceMap:
+    """
+    Fewest steps from a start plot to every plot of the garden up to `max_steps` away, found
+    with a single BFS. Plots are counted by distance and parity, so the number of plots a walk
+    of any length can end on is a lookup.
+    """
+
+    def __init__(self, garden: Grid, start: int, max_steps: int) -> None:
+        self.max_steps = max_steps
+        self.distances = array("l", [-1]) * len(garden.cells)
+        self.distances[start] = 0
+        histogram = [1]
+
+        cells, distances, width = garden.cells, self.distances, garden.width
+        last_row = len(cells) - width
+        frontier = [start]
+        for distance in range(1, max_steps + 1):
+            following: list[int] = []
+            for position in frontier:
+                column = position % width
+                for next_step in (
+                    position - width if position >= width else -1,
+                    position + 1 if column < width - 1 else -1,
+                    position + width if position < last_row else -1,
+                    position - 1 if column > 0 else -1,
+                ):
+                    if next_step < 0:
+                        continue
+                    if distances[next_step] < 0 and cells[next_step] != ROCK:
+                        distances[next_step] = distance
+                        following.append(next_step)
+            if not following:
+                break
+            histogram.append(len(following))
+            frontier = following
+
+        # Plots at most `distance` away and with its same parity
+        self._same_parity = histogram.copy()
+        for distance in range(2, len(histogram)):
+            self._same_parity[distance] += self._same_parity[distance - 2]
+
+    def reachable(self, steps: int) -> int:
+        """
+        Plots where a walk of exactly `steps` can end: those at most `steps` away with the same
+        parity, as the walk can go back and forth to waste any even number of steps.
+        """
+        if not 0 <= steps <= self.max_steps:
+            raise ValueError(f"steps should be between 0 and {self.max_steps}")
+        farthest = len(self._same_parity) - 1
+        if steps > farthest:
+            steps = farthest if (steps - farthest) % 2 == 0 else farthest - 1
+        return self._same_parity[steps] if steps >= 0 else 0
+
+    def reachable_counts(self, steps: Iterable[int]) -> list[int]:
+        return [self.reachable(s) for s in steps]
 
 
 def solution_part_1(input: YieldStr, steps: int) -> int:
-    garden, start_pos = parse_input(input)
-    current_positions: set[Point] = {start_pos}
-    next_positions: set[Point] = set()
+    garden, start = parse_input(input)
+    return DistanceMap(garden, start, steps).reachable(steps)
+
+
+def infinite_garden_distances(garden: Grid, start: int, max_steps: int) -> DistanceMap:
+    """Step distances on enough copies of the garden around it to walk `max_steps`."""
+    radius = max_steps // min(garden.width, garden.height) + 1
+    copies = 2 * radius + 1
+    tiled = garden.tiled(copies, copies)
+    row, column = garden.point(start)
+    tiled_start = tiled.index(row + radius * garden.height, column + radius * garden.width)
+    return DistanceMap(tiled, tiled_start, max_steps)
+
+
+def second_differences(values: list[int]) -> list[int]:
+    triples = zip(values, values[1:], values[2:])
+    return [third - 2 * second + first for first, second, third in triples]
+
+
+# Once the walk spans a few gardens, the number of reachable plots grows quadratically
+# every time the walk crosses one more garden. The walk is sampled garden after garden
+# until the growth settles into a quadratic, which is then extrapolated to any number of
+# gardens. Walks that end before that are counted directly.
+def solution_part_2(input: YieldStr, steps: int = 26_501_365) -> int:
+    garden, start = parse_input(input)
+    if garden.width != garden.height:
+        raise ValueError("The garden should be a square")
+    size = garden.width
+    offset = steps % size
+    gardens = steps // size
 
-    for _ in range(steps):
-        for position in current_positions:
-            posible_positions = posible_steps(garden, position)
-            next_positions.update(posible_positions)
-        current_positions = next_positions
-        next_positions = set()
+    samples = MIN_SAMPLES
+    while True:
+        if gardens < samples:
+            return infinite_garden_distances(garden, start, steps).reachable(steps)
+        distances = infinite_garden_distances(garden, start, offset + size * (samples - 1))
+        counts = distances.reachable_counts(offset + size * i for i in range(samples))
+        differences = second_differences(counts)
+        if len(set(differences[-STABLE_DIFFERENCES:])) == 1:
+            break
+        if samples >= MAX_SAMPLES:
+            raise ValueError(
+                f"The reachable plots don't grow quadratically: the last {STABLE_DIFFERENCES} "
+                f"second differences of {samples} samples are {differences[-STABLE_DIFFERENCES:]}"
+            )
+        samples *= 2
 
-    return len(current_positions)
+    # Extrapolate from the last sample with a constant second difference
+    last = samples - 1
+    delta = counts[last] - counts[last - 1]
+    remaining = gardens - last
+    return counts[last] + remaining * delta + remaining * (remaining + 1) // 2 * differences[-1]
 
 
-def solution_part_2(input: YieldStr) -> int:
-    return 0
+SOLVERS = (
+    Solver(partial(solution_part_1, steps=64)),
+    Solver(solution_part_2),
+)
 
 
 if __name__ == "__main__":
@@ -4,15 +4,36 @@ import pytest
 
 from aoc.tools import relative_test_file
 
-from .challenge import solution_part_1, solution_part_2
+from . import challenge
+from .challenge import DistanceMap, parse_input, solution_part_1, solution_part_2
 
 
 @pytest.mark.parametrize(
     "solution, output",
     [
         (functools.partial(solution_part_1, steps=6), 16),
-        (solution_part_2, 0),
+        (functools.partial(solution_part_2, steps=6), 16),
+        (functools.partial(solution_part_2, steps=10), 50),
+        (functools.partial(solution_part_2, steps=50), 1594),
+        (functools.partial(solution_part_2, steps=100), 6536),
+        (functools.partial(solution_part_2, steps=500), 167004),
+        (functools.partial(solution_part_2, steps=1000), 668697),
+        (functools.partial(solution_part_2, steps=5000), 16733044),
     ],
 )
 def test_solution(solution, output):
     assert solution(relative_test_file(__file__)) == output
+
+
+def test_reachable_counts():
+    garden, start = parse_input(relative_test_file(__file__))
+    distances = DistanceMap(garden, start, max_steps=100)
+    assert distances.reachable_counts([0, 1, 2, 3, 6, 63, 64, 100]) == [1, 2, 4, 6, 16, 39, 42, 42]
+    with pytest.raises(ValueError):
+        distances.reachable(101)
+
+
+def test_unstable_growth(monkeypatch):
+    monkeypatch.setattr(challenge, "MAX_SAMPLES", challenge.MIN_SAMPLES)
+    with pytest.raises(ValueError, match="don't grow quadratically"):
+        solution_part_2(relative_test_file(__file__), steps=5000)
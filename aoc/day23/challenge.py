@@ -1,127 +1,296 @@
-import enum
-from collections import deque
+import os
 from dataclasses import dataclass
-from pathlib import Path
-from typing import TypeAlias
+from typing import TYPE_CHECKING, Container, Sequence
 
 from aoc.tools import YieldStr, run_challenge
-from utils.matrix import Direction, Point
+from aoc.tools.cache import cached_parser
+from utils.matrix import Grid
 
-Map: TypeAlias = list[str]
+if TYPE_CHECKING:
+    from multiprocessing.sharedctypes import Synchronized
+
+FOREST = ord("#")
+PATH = ord(".")
+# Slopes by the index of the only direction they can be crossed, in `Direction` order
+SLOPES = {ord("^"): 0, ord(">"): 1, ord("v"): 2, ord("<"): 3}
+# Smaller graphs are searched faster than a process pool can start
+PARALLEL_MIN_JUNCTIONS = 24
+SPLIT_DEPTH = 6
+# Junctions visited by a pool worker between reads of the best length shared by all
+SHARED_BEST_INTERVAL = 1024
 
 
 @dataclass(slots=True)
-class HikePath:
-    path: set[Point]
-    current_position: Point
-    previous_position: Point
+class TrailGraph:
+    """
+    The junctions of the map numbered from 0, with the trails between them. `trails[node]`
+    holds a (junction, length) pair for each trail that can be hiked from `node`.
+    """
+
+    trails: list[list[tuple[int, int]]]
+    start: int
+    end: int
 
     def __len__(self) -> int:
-        return len(self.path)
-
-    def add_position(self, position: Point) -> None:
-        self.path.add(position)
-        self.previous_position = self.current_position
-        self.current_position = position
-
-    def output_hike(self, layout_map: Map, file_name: str | None = None) -> None:
-        file_name = file_name or "output.txt"
-        output_dir = Path(__file__).parent / "output"
-        output_dir.mkdir(exist_ok=True)
-
-        new_map = [list(row) for row in layout_map]
-        for point in self.path:
-            row, column = point
-            new_map[row][column] = "O"
-
-        with open(output_dir / file_name, "w", encoding="utf-8") as output:
-            for row in new_map:
-                print("".join(row), file=output)
-
-
-class Tile(enum.StrEnum):
-    PATH = "."
-    FOREST = "#"
-    UP_SLOPE = "^"
-    DOWN_SLOPE = "v"
-    LEFT_SLOPE = "<"
-    RIGHT_SLOPE = ">"
-
-    # pylint: disable=R0916
-    def can_pass(self, direction: Direction) -> bool:
-        if self is Tile.FOREST:
-            return False
-        if (
-            (self is Tile.PATH)
-            or (self is Tile.UP_SLOPE and direction is Direction.UP)
-            or (self is Tile.DOWN_SLOPE and direction is Direction.DOWN)
-            or (self is Tile.LEFT_SLOPE and direction is Direction.LEFT)
-            or (self is Tile.RIGHT_SLOPE and direction is Direction.RIGHT)
-        ):
-            return True
-        return False
-
-
-def allowed_paths(layout_map: Map, position: Point, previous_position: Point | None) -> list[Point]:
-    row_limits = range(len(layout_map))
-    column_limits = range(len(layout_map[0]))
-    directions = list(Direction)
-
-    if previous_position is not None:
-        directions.remove(Direction(previous_position - position))  # pyright: ignore
-
-    paths: list[Point] = []
-    for direction in directions:
-        path = position + direction
-        if not (path.row in row_limits and path.column in column_limits):
-            continue
-        tile = Tile(layout_map[path.row][path.column])
-        if not tile.can_pass(direction):
+        return len(self.trails)
+
+
+@cached_parser
+def parse_input(input: YieldStr) -> Grid:
+    return Grid.from_lines(input)
+
+
+def find_junctions(layout: Grid) -> list[int]:
+    """Cells where trails meet, plus the start and end cells, which come first."""
+    cells = layout.cells
+    start = cells.index(PATH, 0, layout.width)
+    end = cells.index(PATH, len(cells) - layout.width)
+    junctions = [start, end]
+    for cell, tile in enumerate(cells):
+        if tile == FOREST or cell in (start, end):
             continue
-        paths.append(path)
-    return paths
+        open_neighbours = sum(cells[n] != FOREST for n in layout.neighbours(cell))
+        if open_neighbours >= 3:
+            junctions.append(cell)
+    return junctions
+
 
+@dataclass(slots=True)
+class TrailWalker:
+    """The map with its neighbour table and junctions, to follow the trails between them."""
 
-def find_paths(layout_map: Map, start: Point, end: Point) -> list[HikePath]:
-    final_paths: list[HikePath] = []
-    queue = deque([HikePath(set(), start, start + Direction.UP)])
+    layout: Grid
+    neighbours: Sequence[int]
+    junctions: Container[int]
+    slippery: bool
 
-    while queue:
-        path = queue.popleft()
-        while path.current_position != end:
-            positions = allowed_paths(layout_map, path.current_position, path.previous_position)
-            next_position = positions.pop(0)
-            if positions:
-                for position in positions:
-                    new_path = path.path.copy()
-                    new_path.add(position)
-                    queue.append(HikePath(new_path, position, path.current_position))
-            path.add_position(next_position)
-        final_paths.append(path)
-    return final_paths
+    def follow_trail(self, cell: int, direction: int) -> tuple[int, int] | None:
+        """
+        Walks from a junction into `cell` towards `direction` until reaching another junction.
+        Returns that junction and the length of the trail, or None for dead ends and trails
+        crossing a slippery slope the wrong way.
+        """
+        cells, neighbours, junctions = self.layout.cells, self.neighbours, self.junctions
+        previous = neighbours[cell * 4 + (direction + 2) % 4]
+        length = 1
+        while True:
+            if self.slippery and SLOPES.get(cells[cell], direction) != direction:
+                return None
+            if cell in junctions:
+                return cell, length
+            for step in range(4):
+                following = neighbours[cell * 4 + step]
+                if following not in (-1, previous) and cells[following] != FOREST:
+                    break
+            else:
+                return None
+            previous, cell, direction = cell, following, step
+            length += 1
 
 
-def dump_paths(layout: Map, hike_paths: list[HikePath]) -> None:
-    for i, hike_path in enumerate(hike_paths, 1):
-        hike_path.output_hike(layout, f"output-{i:0>3}.txt")
+def compress_map(layout: Grid, slippery: bool = True) -> TrailGraph:
+    """Graph of the trails between junctions, slippery slopes can only be crossed downhill."""
+    neighbours = layout.neighbour_table()
+    junctions = find_junctions(layout)
+    ids = {cell: node for node, cell in enumerate(junctions)}
+    walker = TrailWalker(layout, neighbours, ids, slippery)
+    trails: list[list[tuple[int, int]]] = [[] for _ in junctions]
 
+    for node, junction in enumerate(junctions):
+        for direction in range(4):
+            cell = neighbours[junction * 4 + direction]
+            if cell < 0 or layout.cells[cell] == FOREST:
+                continue
+            trail = walker.follow_trail(cell, direction)
+            if trail is not None:
+                end, length = trail
+                trails[node].append((ids[end], length))
 
-def solution_part_1(input: YieldStr) -> int:
-    island_map = list(input)
-    start_column = island_map[0].index(Tile.PATH)
-    end_column = island_map[-1].index(Tile.PATH)
+    return TrailGraph(trails, start=0, end=1)
+
+
+class HikeSearch:
+    """
+    Depth first search of the longest hike from start to end that never visits a junction
+    twice, with the visited junctions as a bitmask. A branch is pruned when the end can't be
+    reached anymore, or when adding the longest trail into each junction still reachable
+    can't beat the best hike found so far.
+    """
+
+    def __init__(self, graph: TrailGraph) -> None:
+        self.start = graph.start
+        self.end = graph.end
+        self.best = -1
+        # Longer trails first, so long hikes are found early and prune more
+        self.trails = [sorted(node_trails, key=lambda t: -t[1]) for node_trails in graph.trails]
+        self.longest_into = [0] * len(graph)
+        for node_trails in self.trails:
+            for junction, length in node_trails:
+                self.longest_into[junction] = max(self.longest_into[junction], length)
+
+        # A hike passing by the last junction before the end without taking it is stuck
+        into_end = [
+            node
+            for node, node_trails in enumerate(self.trails)
+            if any(junction == self.end for junction, _ in node_trails)
+        ]
+        if len(into_end) == 1:
+            self.trails[into_end[0]] = [
+                trail for trail in self.trails[into_end[0]] if trail[0] == self.end
+            ]
+
+        self.successors = [
+            sum(1 << junction for junction, _ in node_trails) for node_trails in self.trails
+        ]
+
+    def reachable_bound(self, node: int, visited: int) -> int:
+        """Upper bound of the rest of the hike, or -1 if the end can't be reached anymore."""
+        successors, longest_into = self.successors, self.longest_into
+        reachable = frontier = 1 << node
+        while frontier:
+            expanded = 0
+            while frontier:
+                lowest = frontier & -frontier
+                expanded |= successors[lowest.bit_length() - 1]
+                frontier ^= lowest
+            frontier = expanded & ~visited & ~reachable
+            reachable |= frontier
+        if not reachable >> self.end & 1:
+            return -1
+        reachable ^= 1 << node
+        bound = 0
+        while reachable:
+            lowest = reachable & -reachable
+            bound += longest_into[lowest.bit_length() - 1]
+            reachable ^= lowest
+        return bound
 
-    start_position = Point(0, start_column)
-    end_position = Point(len(island_map) - 1, end_column)
+    def branches(self, depth: int) -> list[tuple[int, int, int]]:
+        """
+        Splits the search into the (node, visited, length) states reached after hiking
+        `depth` trails from the start. Shorter hikes that already got to the end update `best`.
+        """
+        states = [(self.start, 1 << self.start, 0)]
+        for _ in range(depth):
+            following: list[tuple[int, int, int]] = []
+            for node, visited, length in states:
+                if node == self.end:
+                    self.best = max(self.best, length)
+                    continue
+                for junction, trail_length in self.trails[node]:
+                    if not visited >> junction & 1:
+                        following.append((junction, visited | 1 << junction, length + trail_length))
+            states = following
+        return states
 
-    hike_paths = find_paths(island_map, start_position, end_position)
-    # dump_paths(island_map, hike_paths)
+    def search(
+        self,
+        node: int,
+        visited: int,
+        length: int,
+        shared_best: "Synchronized[int] | None" = None,
+    ) -> int:
+        """
+        Longest hike going on from the given state, or `best` if none is longer. With a
+        `shared_best`, hikes found are published to it and it is read to prune more.
+        """
+        trails, end, reachable_bound = self.trails, self.end, self.reachable_bound
+        best = self.best
+        steps = 0
 
-    return max(len(hike_path) for hike_path in hike_paths)
+        def visit(node: int, visited: int, length: int) -> None:
+            nonlocal best, steps
+            if node == end:
+                if length > best:
+                    best = length
+                    if shared_best is not None:
+                        with shared_best.get_lock():
+                            shared_best.value = max(shared_best.value, best)
+                return
+            steps += 1
+            if shared_best is not None and steps % SHARED_BEST_INTERVAL == 0:
+                best = max(best, shared_best.value)
+            remaining = reachable_bound(node, visited)
+            if remaining < 0 or length + remaining <= best:
+                return
+            for junction, trail_length in trails[node]:
+                if not visited >> junction & 1:
+                    visit(junction, visited | 1 << junction, length + trail_length)
+
+        if shared_best is not None:
+            best = max(best, shared_best.value)
+        visit(node, visited, length)
+        self.best = best
+        return best
+
+
+# Search of the pool workers, set by `_init_worker`
+_worker_search: "tuple[HikeSearch, Synchronized[int]] | None" = None
+
+
+def _init_worker(search: HikeSearch, shared_best: "Synchronized[int]") -> None:
+    global _worker_search  # pylint: disable=W0603
+    _worker_search = search, shared_best
+
+
+def _search_branch(branch: tuple[int, int, int]) -> int:
+    assert _worker_search is not None
+    search, shared_best = _worker_search
+    return search.search(*branch, shared_best=shared_best)
+
+
+def longest_hike(
+    graph: TrailGraph,
+    workers: int | None = 1,
+    split_depth: int = SPLIT_DEPTH,
+) -> int:
+    """
+    Length of the longest hike. With more than one worker (None for one per CPU), the search
+    is split into the branches `split_depth` trails away from the start, which are searched
+    in a process pool sharing the best length found so far to prune each other's branches.
+    """
+    search = HikeSearch(graph)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 1:
+        best = search.search(search.start, 1 << search.start, 0)
+    else:
+        best = _parallel_search(search, workers, split_depth)
+    if best < 0:
+        raise ValueError("There is no hike from the start to the end")
+    return best
+
+
+def _parallel_search(search: HikeSearch, workers: int, split_depth: int) -> int:
+    import multiprocessing  # pylint: disable=C0415
+    from concurrent.futures import ProcessPoolExecutor  # pylint: disable=C0415
+
+    branches = search.branches(split_depth)
+    # Longest prefixes first, as they tend to give a good bound sooner
+    branches.sort(key=lambda branch: -branch[2])
+    shared_best = multiprocessing.Value("q", search.best)
+    with ProcessPoolExecutor(
+        workers,
+        initializer=_init_worker,
+        initargs=(search, shared_best),
+    ) as executor:
+        found = max(executor.map(_search_branch, branches), default=-1)
+    return max(found, shared_best.value)
+
+
+def solution_part_1(input: YieldStr) -> int:
+    return longest_hike(compress_map(parse_input(input), slippery=True))
 
 
-def solution_part_2(input: YieldStr) -> int:
-    return 0
+def solution_part_2(
+    input: YieldStr,
+    workers: int | None = None,
+    split_depth: int = SPLIT_DEPTH,
+) -> int:
+    graph = compress_map(parse_input(input), slippery=False)
+    if len(graph) < PARALLEL_MIN_JUNCTIONS:
+        workers = 1
+    return longest_hike(graph, workers, split_depth)
 
 
 if __name__ == "__main__":
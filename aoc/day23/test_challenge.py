@@ -2,15 +2,32 @@ import pytest
 
 from aoc.tools import relative_test_file
 
-from .challenge import solution_part_1, solution_part_2
+from . import challenge
+from .challenge import compress_map, longest_hike, parse_input, solution_part_1, solution_part_2
 
 
 @pytest.mark.parametrize(
     "solution, output",
     [
         (solution_part_1, 94),
-        (solution_part_2, 0),
+        (solution_part_2, 154),
     ],
 )
 def test_solution(solution, output):
     assert solution(relative_test_file(__file__)) == output
+
+
+@pytest.mark.parametrize("split_depth", [0, 2, 5])
+def test_parallel_search(split_depth):
+    graph = compress_map(parse_input(relative_test_file(__file__)), slippery=False)
+    assert longest_hike(graph, workers=2, split_depth=split_depth) == 154
+
+
+def test_single_cpu_search_is_serial(monkeypatch):
+    def parallel_search(*_):
+        raise AssertionError("A single CPU should search serially")
+
+    monkeypatch.setattr(challenge.os, "cpu_count", lambda: 1)
+    monkeypatch.setattr(challenge, "_parallel_search", parallel_search)
+    graph = compress_map(parse_input(relative_test_file(__file__)), slippery=False)
+    assert longest_hike(graph, workers=None) == 154
@@ -3,7 +3,8 @@ from functools import partial
 from itertools import islice
 from typing import NamedTuple, Self, Sequence
 
-from aoc.tools import YieldStr, run_challenge
+from aoc.tools import Solver, YieldStr, run_challenge
+from aoc.tools.cache import cached_parser
 from utils.iterutils import find_numbers
 
 
@@ -84,6 +85,7 @@ def number_intersections(
     return total_intersections
 
 
+@cached_parser
 def parse_input(input: YieldStr) -> list[Hailstone]:
     hailstones = []
     for line in input:
@@ -103,5 +105,11 @@ def solution_part_2(input: YieldStr) -> int:
     return 0
 
 
+SOLVERS = (
+    Solver(partial(solution_part_1, at_least=200_000_000_000_000, at_most=400_000_000_000_000)),
+    Solver(solution_part_2),
+)
+
+
 if __name__ == "__main__":
     run_challenge(partial(solution_part_1, at_least=7, at_most=27), __file__, debug=True)
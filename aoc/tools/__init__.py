@@ -1,59 +1,193 @@
 from __future__ import annotations
 
 import functools
-from pathlib import Path
-from typing import TYPE_CHECKING, Callable, Iterator, TypeAlias
+import os
+import stat
+import weakref
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Callable, Iterator, NamedTuple, TypeAlias
 
 if TYPE_CHECKING:
     from _typeshed import StrPath
 
+    from aoc.tools.profiling import ProfileMode
+
 
 YieldStr: TypeAlias = Iterator[str]
+# A file path, or the descriptor of an already open file or stream (e.g. stdin)
+Source: TypeAlias = "StrPath | int"
+Reader: TypeAlias = Callable[[Source], Iterator[Any]]
+
+# Big reads keep the number of system calls low when streaming from a pipe
+READ_BUFFER_SIZE = 1024 * 1024
+STDIN_FILENO = 0
+
+# Remembers which file each reader iterator comes from, see `aoc.tools.cache`
+_input_paths: weakref.WeakKeyDictionary[Iterator[Any], str] = weakref.WeakKeyDictionary()
 
 
-def read_lines_from_file(path: StrPath) -> Iterator[str]:
+def read_lines_from_file(path: Source) -> Iterator[str]:
     """Yields one line at a time for a given file."""
-    with open(path, "r", encoding="utf-8") as file:
+    closefd = not isinstance(path, int)
+    with open(path, "r", encoding="utf-8", buffering=READ_BUFFER_SIZE, closefd=closefd) as file:
         for line in file:
             yield line.strip()
 
 
+def read_lines_from_mmap(path: Source) -> Iterator[memoryview]:
+    """
+    Yields one line at a time as a view into the memory-mapped file, without decoding or
+    copying it. Unlike `read_lines_from_file`, only the line ending is removed.
+    The lines are bytes, not `str`, so this only suits parsers that work on bytes-like
+    lines, such as `utils.matrix.Grid.from_lines`.
+    """
+    import mmap  # pylint: disable=C0415
+
+    with open(path, "rb", closefd=not isinstance(path, int)) as file:
+        file_stat = os.fstat(file.fileno())
+        if not stat.S_ISREG(file_stat.st_mode):
+            raise ValueError("Only regular files can be memory-mapped, not streams")
+        if file_stat.st_size == 0:
+            return
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # The mapping is released once the last view into it is garbage collected
+    view = memoryview(mapped)
+    size = len(mapped)
+    start = 0
+    while start < size:
+        end = mapped.find(b"\n", start)
+        if end == -1:
+            end = size
+        stop = end - 1 if end > start and view[end - 1] == 0x0D else end  # \r\n endings
+        yield view[start:stop]
+        start = end + 1
+
+
+def open_input(path: Source, reader: Reader | None = None) -> Iterator[Any]:
+    """Creates the input iterator of a file, keeping track of the file it reads."""
+    input = (reader or read_lines_from_file)(path)
+    if isinstance(path, int):
+        return input
+    try:
+        _input_paths[input] = os.fspath(path)
+    except TypeError:
+        pass  # The iterator doesn't support weak references
+    return input
+
+
+def input_path(input: Iterator[Any]) -> str | None:
+    """Path of the file read by an iterator created with `open_input`, if known."""
+    try:
+        return _input_paths.get(input)
+    except TypeError:
+        return None
+
+
 def relative_input_file_path(relative_to: str, name: str | None = None) -> str:
     """Finds and retrieves the path of a *input.txt file."""
     if name is None:
         name = "test-input.txt"
-    path = Path(relative_to)
-    path = path.parent / name if not path.is_dir() else path / name
-    return str(path)
+    directory = relative_to if os.path.isdir(relative_to) else os.path.dirname(relative_to)
+    return os.path.join(directory, name)
+
+
+def resolve_source(source: str) -> Source:
+    """Input source given in the command line: `-` for stdin, a file descriptor or a path."""
+    if source == "-":
+        return STDIN_FILENO
+    if source.isdigit():
+        return int(source)
+    return source
 
 
 def relative_test_file(
     relative_to: str,
     name: str | None = None,
-    reader: Callable[[StrPath], Iterator[str]] | None = None,
-) -> Iterator[str]:
+    reader: Reader | None = None,
+) -> Iterator[Any]:
     """Automatically creates a generator for test-input.txt file."""
-    path = relative_input_file_path(relative_to, name)
-    reader = reader or read_lines_from_file
-    return reader(path)
+    return open_input(relative_input_file_path(relative_to, name), reader)
+
+
+def format_output(name: str, output: int) -> str:
+    return f"{name}: {output:<20,}{output}"
+
+
+def solution_name(solution: Callable[..., int]) -> str:
+    real_func = solution.func if isinstance(solution, functools.partial) else solution
+    return real_func.__name__
+
+
+# A NamedTuple rather than a dataclass, since `dataclasses` is slow to import
+class Solver(NamedTuple):
+    """A solution together with the way its input file should be provided."""
+
+    solution: Callable[..., int]
+    reader: Reader | None = None
+    with_path: bool = False
+
+    @property
+    def name(self) -> str:
+        return solution_name(self.solution)
+
+    def solve(self, path: Source) -> int:
+        if self.with_path:
+            if isinstance(path, int):
+                raise ValueError(f"{self.name} needs a file path, it can't read from a stream")
+            return self.solution(path)
+        return self.solution(open_input(path, self.reader))
 
 
-def format_output(solution_name: str, output: int) -> str:
-    return f"{solution_name}: {output:<20,}{output}"
+def find_solvers(challenge: ModuleType) -> list[Solver]:
+    """
+    Solvers of a challenge module. Modules that need a custom reader or extra arguments
+    declare them in a `SOLVERS` sequence, otherwise `solution_part_*` functions are used.
+    """
+    solvers = getattr(challenge, "SOLVERS", None)
+    if solvers is not None:
+        return list(solvers)
+    names = ("solution_part_1", "solution_part_2")
+    return [Solver(getattr(challenge, name)) for name in names if hasattr(challenge, name)]
 
 
-def run_challenge(
-    solution: Callable[[Iterator[str]], int],
+def run_solver(
+    solver: Solver,
     relative_to: str,
-    reader: Callable[[StrPath], Iterator[str]] | None = None,
     *,
     debug: bool = False,
+    source: Source | None = None,
+    profile: ProfileMode | None = None,
+) -> None:
+    """
+    Runs a solver with the input file of its day and prints its output.
+    A `source` (e.g. the descriptor of stdin) replaces the input file.
+    With `profile`, the solver runs under one of the profilers of `aoc.tools.profiling`.
+    """
+    if source is None:
+        source = relative_input_file_path(relative_to, None if debug else "input.txt")
+    if profile is None:
+        output = solver.solve(source)
+    else:
+        from aoc.tools.profiling import run_profiled  # pylint: disable=C0415
+
+        day_dir = relative_to if os.path.isdir(relative_to) else os.path.dirname(relative_to)
+        output = run_profiled(solver, source, profile, day_dir)
+    print(format_output(solver.name, output))
+
+
+def run_challenge(  # pylint: disable=R0913
+    solution: Callable[[Iterator[Any]], int],
+    relative_to: str,
+    reader: Reader | None = None,
+    *,
+    debug: bool = False,
+    source: Source | None = None,
+    profile: ProfileMode | None = None,
 ) -> None:
     """Runs the challenge solution with the given input and prints its output."""
-    name = None if debug else "input.txt"
-    output = solution(relative_test_file(relative_to, name, reader))
-    real_func = solution.func if isinstance(solution, functools.partial) else solution
-    print(format_output(real_func.__name__, output))
+    solver = Solver(solution, reader)
+    run_solver(solver, relative_to, debug=debug, source=source, profile=profile)
 
 
 def run_challenge_with_path(
@@ -61,8 +195,7 @@ def run_challenge_with_path(
     relative_to: str,
     *,
     debug: bool = False,
+    profile: ProfileMode | None = None,
 ) -> None:
     """Like `run_challenge` but retrieves the file path of the input file instead of a iterator."""
-    name = None if debug else "input.txt"
-    output = solution(relative_input_file_path(relative_to, name))
-    print(format_output(solution.__name__, output))
+    run_solver(Solver(solution, with_path=True), relative_to, debug=debug, profile=profile)
@@ -0,0 +1,179 @@
+"""Benchmark the solutions of the day challenges and check them against a baseline."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Iterable
+
+from aoc.tools.cache import CACHE_DIR_ENV
+from aoc.tools.runner import Task, find_days, find_tasks, format_time
+
+
+@dataclass(frozen=True, slots=True)
+class Benchmark:
+    min: float
+    median: float
+    p95: float
+    peak_memory: int
+
+
+def percentile(sorted_samples: list[float], percent: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    rank = math.ceil(percent / 100 * len(sorted_samples))
+    return sorted_samples[max(rank, 1) - 1]
+
+
+def peak_memory(task: Task) -> int:
+    """Peak of memory allocated by Python while solving, in bytes."""
+    tracemalloc.start()
+    try:
+        task.solver.solve(task.path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def benchmark(task: Task, repeat: int = 5, warmup: int = 1) -> Benchmark:
+    """
+    Times `repeat` runs of the solver after `warmup` untimed runs. Memory is traced on a
+    separate run, since `tracemalloc` slows down the solver.
+    """
+    if repeat < 1:
+        raise ValueError("repeat must be at least one")
+    for _ in range(warmup):
+        task.solver.solve(task.path)
+
+    samples: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        task.solver.solve(task.path)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+
+    return Benchmark(
+        min=samples[0],
+        median=statistics.median(samples),
+        p95=percentile(samples, 95),
+        peak_memory=peak_memory(task),
+    )
+
+
+def task_key(task: Task) -> str:
+    return f"{task.day}/{task.solver.name}"
+
+
+def run_benchmarks(
+    tasks: Iterable[Task],
+    repeat: int = 5,
+    warmup: int = 1,
+) -> tuple[dict[str, Benchmark], dict[str, str]]:
+    """
+    Benchmarks the tasks with an input file. A failing task is kept as an error by its key,
+    without stopping the others.
+    """
+    results: dict[str, Benchmark] = {}
+    errors: dict[str, str] = {}
+    for task in tasks:
+        if not os.path.exists(task.path):
+            continue
+        try:
+            results[task_key(task)] = benchmark(task, repeat, warmup)
+        except Exception as exc:  # pylint: disable=W0718
+            errors[task_key(task)] = f"{type(exc).__name__}: {exc}"
+    return results, errors
+
+
+def find_regressions(
+    results: dict[str, Benchmark],
+    baseline: dict[str, Benchmark],
+    threshold: float,
+) -> list[str]:
+    """Keys of the results whose median time got slower than the baseline past `threshold`."""
+    return [
+        key
+        for key, result in results.items()
+        if key in baseline and result.median > baseline[key].median * (1 + threshold)
+    ]
+
+
+def load_baseline(path: str) -> dict[str, Benchmark]:
+    with open(path, "r", encoding="utf-8") as file:
+        return {key: Benchmark(**values) for key, values in json.load(file).items()}
+
+
+def save_baseline(path: str, results: dict[str, Benchmark]) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({key: asdict(result) for key, result in results.items()}, file, indent=2)
+        file.write("\n")
+
+
+def format_table(
+    results: dict[str, Benchmark],
+    regressions: Iterable[str] = (),
+    errors: dict[str, str] | None = None,
+) -> str:
+    slower = set(regressions)
+    header = f"{'Solver':<24}{'Min':>12}{'Median':>12}{'P95':>12}{'Peak memory':>14}"
+    lines = [header]
+    for key, result in results.items():
+        line = (
+            f"{key:<24}{format_time(result.min):>12}{format_time(result.median):>12}"
+            f"{format_time(result.p95):>12}{result.peak_memory / 1024:>11,.0f} KiB"
+        )
+        if key in slower:
+            line += "  REGRESSION"
+        lines.append(line)
+    for key, error in (errors or {}).items():
+        lines.append(f"{key:<24}{error}")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m aoc.bench", description=__doc__)
+    parser.add_argument("days", metavar="D", nargs="*", type=int, help="Only these days.")
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="Timed runs per solver.")
+    parser.add_argument("-w", "--warmup", type=int, default=1, help="Untimed runs per solver.")
+    parser.add_argument("--debug", action="store_true", help="Use the test-input.txt files.")
+    parser.add_argument("--save", metavar="PATH", help="Write the results to a JSON baseline.")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare against a JSON baseline.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Allowed slowdown of the median time before failing (default: 0.10 = 10%%).",
+    )
+    parser.add_argument("--cache", metavar="DIR", help="Cache the parsed inputs in DIR.")
+    args = parser.parse_args()
+
+    if args.cache is not None:
+        os.environ[CACHE_DIR_ENV] = args.cache
+
+    tasks = find_tasks(find_days(args.days), debug=args.debug)
+    results, errors = run_benchmarks(tasks, args.repeat, args.warmup)
+
+    regressions: list[str] = []
+    if args.baseline is not None:
+        regressions = find_regressions(results, load_baseline(args.baseline), args.threshold)
+
+    print(format_table(results, regressions, errors))
+
+    if args.save is not None:
+        save_baseline(args.save, results)
+    if regressions:
+        print(f"\nSolvers slower than the baseline: {', '.join(regressions)}")
+    if errors:
+        print(f"\nSolvers that failed: {', '.join(errors)}")
+    return 1 if regressions or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Opt-in cache of parsed inputs. Set the `AOC_CACHE_DIR` environment variable (or use the
+`--cache` option of the runners) to store the result of the parsers decorated with
+`cached_parser`, so identical input files are not parsed again on later runs.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import sys
+from typing import TYPE_CHECKING, Any, Callable, Iterator, TypeVar
+
+from aoc.tools import input_path
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from _typeshed import StrPath
+
+T = TypeVar("T")
+
+CACHE_DIR_ENV = "AOC_CACHE_DIR"
+CACHE_SIZE_ENV = "AOC_CACHE_SIZE"
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+_MISSING = object()
+
+
+def file_digest(path: StrPath) -> str:
+    import hashlib  # pylint: disable=C0415
+
+    with open(path, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+def module_digest(name: str) -> str:
+    """Digest of the source file of a module, empty for modules without one."""
+    module = sys.modules.get(name)
+    if module is not None:
+        path = getattr(module, "__file__", None)
+    else:
+        import importlib.util  # pylint: disable=C0415
+
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, ValueError):
+            spec = None
+        path = spec.origin if spec is not None else None
+    if path is None or not os.path.isfile(path):
+        return ""
+    return file_digest(path)
+
+
+def dumps_with_modules(value: object) -> tuple[bytes, set[str]]:
+    """Pickles a value, also returning the modules of the classes needed to unpickle it."""
+    import io  # pylint: disable=C0415
+    import pickle  # pylint: disable=C0415
+
+    modules: set[str] = set()
+
+    class Pickler(pickle.Pickler):
+        def reducer_override(self, obj: Any) -> Any:
+            modules.add((obj if isinstance(obj, type) else type(obj)).__module__)
+            return NotImplemented
+
+    buffer = io.BytesIO()
+    Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(value)
+    return buffer.getvalue(), modules
+
+
+class ParseCache:
+    """
+    Pickled parser results, the least recently used are evicted past `max_size` bytes.
+    Each entry starts with the digests of the modules whose classes it pickles, so an entry
+    becomes stale when one of those classes changes, not only when the parser does.
+    """
+
+    SUFFIX = ".pickle"
+
+    def __init__(self, directory: StrPath, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        from pathlib import Path  # pylint: disable=C0415
+
+        self.directory = Path(directory)
+        self.max_size = max_size
+
+    def key(
+        self,
+        parser: Callable[..., object],
+        path: StrPath,
+        *args: object,
+        **kwargs: object,
+    ) -> str:
+        """
+        Key for the result of a parser with a given input file. The file of the parser's module
+        is part of the key, so editing the parser (or the classes it builds) invalidates it.
+        """
+        import hashlib  # pylint: disable=C0415
+
+        module_file = getattr(sys.modules.get(parser.__module__), "__file__", None)
+        parts = (
+            f"{parser.__module__}.{parser.__qualname__}",
+            file_digest(module_file) if module_file else "",
+            file_digest(path),
+            repr((args, sorted(kwargs.items()))),
+        )
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.directory / f"{key}{self.SUFFIX}"
+
+    def load(self, key: str) -> Any:
+        """The cached value, or `_MISSING` if there is none. Stale entries are evicted."""
+        import pickle  # pylint: disable=C0415
+
+        entry = self._entry(key)
+        try:
+            with open(entry, "rb") as file:
+                dependencies: dict[str, str] = pickle.load(file)
+                if any(module_digest(name) != digest for name, digest in dependencies.items()):
+                    raise ValueError("A module of the pickled classes changed")
+                value = pickle.load(file)
+        except FileNotFoundError:
+            return _MISSING
+        # Unpickling changed classes can fail in many ways (AttributeError, TypeError, ...)
+        except Exception:  # pylint: disable=W0718
+            entry.unlink(missing_ok=True)
+            return _MISSING
+        os.utime(entry)  # Mark as recently used
+        return value
+
+    def store(self, key: str, value: object) -> bool:
+        """Stores a value if it can be pickled, returns whether it was stored."""
+        import pickle  # pylint: disable=C0415
+
+        try:
+            data, modules = dumps_with_modules(value)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return False
+        dependencies = {
+            name: module_digest(name)
+            for name in modules
+            if name.partition(".")[0] not in sys.stdlib_module_names
+        }
+        data = pickle.dumps(dependencies, protocol=pickle.HIGHEST_PROTOCOL) + data
+        if len(data) > self.max_size:
+            return False
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry = self._entry(key)
+        temporary = entry.with_suffix(f".{os.getpid()}.tmp")
+        temporary.write_bytes(data)
+        os.replace(temporary, entry)
+        self.evict()
+        return True
+
+    def evict(self) -> None:
+        """Removes the least recently used entries until the cache fits in `max_size`."""
+        entries: list[tuple[float, int, Path]] = []
+        for entry in self.directory.glob(f"*{self.SUFFIX}"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            entry.unlink(missing_ok=True)
+            total_size -= size
+
+    def clear(self) -> None:
+        for entry in self.directory.glob(f"*{self.SUFFIX}"):
+            entry.unlink(missing_ok=True)
+
+
+def active_cache() -> ParseCache | None:
+    """The cache configured through the environment, if any."""
+    directory = os.environ.get(CACHE_DIR_ENV)
+    if not directory:
+        return None
+    max_size = int(os.environ.get(CACHE_SIZE_ENV, DEFAULT_MAX_SIZE))
+    return ParseCache(directory, max_size)
+
+
+def cached_parser(parser: Callable[..., T]) -> Callable[..., T]:
+    """
+    Caches the result of a parser whose first argument is an input iterator created by
+    `aoc.tools`. Without an active cache, or for other iterators, the parser is just called.
+    On a cache hit the input iterator is left unconsumed.
+    """
+
+    @functools.wraps(parser)
+    def wrapper(input: Iterator[Any], *args: Any, **kwargs: Any) -> T:
+        cache = active_cache()
+        path = input_path(input) if cache is not None else None
+        if cache is None or path is None:
+            return parser(input, *args, **kwargs)
+
+        key = cache.key(parser, path, *args, **kwargs)
+        value = cache.load(key)
+        if value is _MISSING:
+            value = parser(input, *args, **kwargs)
+            cache.store(key, value)
+        return value
+
+    return wrapper
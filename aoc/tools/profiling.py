@@ -0,0 +1,125 @@
+"""
+Profile solvers, either deterministically with `cProfile` or with a low-overhead sampler.
+
+The sampler interrupts the process with a profiling timer signal instead of tracing every
+call, so the solver runs at nearly full speed. It only works on Unix and in the main thread.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import signal
+import sys
+from collections import Counter
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import TYPE_CHECKING, Iterator, Literal, TypeAlias
+
+if TYPE_CHECKING:
+    from aoc.tools import Solver, Source
+
+ProfileMode: TypeAlias = Literal["cprofile", "sample"]
+PROFILE_MODES: tuple[ProfileMode, ...] = ("cprofile", "sample")
+DEFAULT_TOP = 20
+
+
+def stats_path(solver: Solver, directory: str | Path) -> Path:
+    return Path(directory) / f"{solver.name}.pstats"
+
+
+def profile_solver(
+    solver: Solver,
+    path: Source,
+    stats_file: str | Path,
+    top: int = DEFAULT_TOP,
+) -> int:
+    """Solves under `cProfile`, saves the stats and prints the top functions by cumulative time."""
+    profiler = cProfile.Profile()
+    output = profiler.runcall(solver.solve, path)
+    profiler.dump_stats(stats_file)
+
+    stats = pstats.Stats(profiler, stream=sys.stdout)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+    print(f"Profile saved to {stats_file}")
+    return output
+
+
+def _code_label(code: CodeType) -> str:
+    return f"{code.co_filename}:{code.co_firstlineno}({code.co_qualname})"
+
+
+class SamplingProfiler:
+    """Counts in which functions the process is found every `interval` seconds of CPU time."""
+
+    def __init__(self, interval: float = 0.001) -> None:
+        self.interval = interval
+        self.own_samples: Counter[CodeType] = Counter()
+        self.cumulative_samples: Counter[CodeType] = Counter()
+        self.total_samples = 0
+        self._previous_handler: signal.Handlers | None = None
+        self._root: FrameType | None = None
+
+    def _sample(self, _signum: int, frame: FrameType | None) -> None:
+        if frame is None:
+            return
+        self.total_samples += 1
+        self.own_samples[frame.f_code] += 1
+        # Recursive functions should only be counted once per sample
+        self.cumulative_samples.update({f.f_code for f in _frames(frame, self._root)})
+
+    def __enter__(self) -> SamplingProfiler:
+        # Frames outside the `with` block are the same on every sample, don't count them
+        self._root = sys._getframe(1)  # pylint: disable=W0212
+        self._previous_handler = signal.signal(signal.SIGPROF, self._sample)  # type: ignore
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        return self
+
+    def __exit__(self, *_) -> None:
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+
+    def report(self, top: int = DEFAULT_TOP) -> str:
+        buf = io.StringIO()
+        total = self.total_samples or 1
+        print(f"{self.total_samples} samples every {self.interval * 1000:g} ms", file=buf)
+        print(f"{'cumulative':>12}{'own':>8}  function", file=buf)
+        for code, samples in self.cumulative_samples.most_common(top):
+            own = self.own_samples[code]
+            print(f"{samples / total:>12.1%}{own / total:>8.1%}  {_code_label(code)}", file=buf)
+        return buf.getvalue()
+
+
+def _frames(frame: FrameType | None, root: FrameType | None) -> Iterator[FrameType]:
+    while frame is not None and frame is not root:
+        yield frame
+        frame = frame.f_back
+
+
+def sample_solver(
+    solver: Solver,
+    path: Source,
+    top: int = DEFAULT_TOP,
+    interval: float = 0.001,
+) -> int:
+    """Solves under the `SamplingProfiler` and prints the functions seen most often."""
+    with SamplingProfiler(interval) as profiler:
+        output = solver.solve(path)
+    print(profiler.report(top), end="")
+    return output
+
+
+def run_profiled(
+    solver: Solver,
+    path: Source,
+    mode: ProfileMode,
+    directory: str | Path,
+    top: int = DEFAULT_TOP,
+) -> int:
+    """Profiles a solver, `cprofile` stats are saved to `<directory>/<solution name>.pstats`."""
+    if mode == "cprofile":
+        return profile_solver(solver, path, stats_path(solver, directory), top)
+    if mode == "sample":
+        return sample_solver(solver, path, top)
+    raise ValueError(f"mode should be one of {PROFILE_MODES}")
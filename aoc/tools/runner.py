@@ -0,0 +1,230 @@
+"""Run the solutions of every day challenge in parallel and report their results."""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
+import re
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from aoc.tools import Solver, Source, find_solvers, relative_input_file_path, resolve_source
+from aoc.tools.cache import CACHE_DIR_ENV
+from aoc.tools.profiling import DEFAULT_TOP, PROFILE_MODES, ProfileMode, run_profiled
+
+AOC_DIR = Path(__file__).parent.parent
+MISSING_INPUT = "missing input file"
+_day_package = re.compile(r"^day(?P<num>\d{2})$")
+
+
+@dataclass(frozen=True, slots=True)
+class Task:
+    day: str
+    solver: Solver
+    path: Source
+
+
+@dataclass(frozen=True, slots=True)
+class Report:
+    task: Task
+    output: int | None = None
+    seconds: float | None = None
+    error: str | None = None
+
+
+def find_days(days: Iterable[int] | None = None) -> list[str]:
+    """Names of the `dayNN` subpackages, optionally filtered by day number."""
+    selected = set(days or ())
+    found: list[str] = []
+    for directory in sorted(AOC_DIR.iterdir()):
+        match = _day_package.match(directory.name)
+        if match is None or not (directory / "__init__.py").exists():
+            continue
+        if selected and int(match.group("num")) not in selected:
+            continue
+        found.append(directory.name)
+    return found
+
+
+def find_tasks(
+    days: Iterable[str],
+    *,
+    debug: bool = False,
+    part: int | None = None,
+    source: Source | None = None,
+) -> Iterator[Task]:
+    """Tasks for the solvers of each day, `source` replaces the input file of every day."""
+    name = None if debug else "input.txt"
+    for day in days:
+        challenge = importlib.import_module(f"aoc.{day}.challenge")
+        path = source
+        if path is None:
+            path = relative_input_file_path(str(AOC_DIR / day), name)
+        for solver in find_solvers(challenge):
+            if part is not None and not solver.name.endswith(f"_{part}"):
+                continue
+            yield Task(day, solver, path)
+
+
+def timed_solve(solver: Solver, path: Source) -> tuple[int, float]:
+    """Solve and measure the wall time taken by the solver."""
+    start = time.perf_counter()
+    output = solver.solve(path)
+    return output, time.perf_counter() - start
+
+
+def _report(task: Task, future: Future[tuple[int, float]]) -> Report:
+    try:
+        output, seconds = future.result()
+    except Exception as exc:  # pylint: disable=W0718
+        return Report(task, error=f"{type(exc).__name__}: {exc}")
+    return Report(task, output, seconds)
+
+
+def run_stream_task(task: Task) -> Report:
+    """Run a task reading a stream in this process, as a stream can only be read once."""
+    try:
+        output, seconds = timed_solve(task.solver, task.path)
+    except Exception as exc:  # pylint: disable=W0718
+        return Report(task, error=f"{type(exc).__name__}: {exc}")
+    return Report(task, output, seconds)
+
+
+def run_profiled_tasks(tasks: Iterable[Task], mode: ProfileMode, top: int) -> list[Report]:
+    """
+    Profile the tasks one by one in this process, printing each profile. A failing task is
+    reported like in `run_tasks`, without stopping the others.
+    """
+    reports: list[Report] = []
+    for task in tasks:
+        if isinstance(task.path, str) and not os.path.exists(task.path):
+            reports.append(Report(task, error=MISSING_INPUT))
+            continue
+        print(f"==> {task.day} {task.solver.name}")
+        start = time.perf_counter()
+        try:
+            output = run_profiled(task.solver, task.path, mode, AOC_DIR / task.day, top)
+        except Exception as exc:  # pylint: disable=W0718
+            reports.append(Report(task, error=f"{type(exc).__name__}: {exc}"))
+            continue
+        reports.append(Report(task, output, time.perf_counter() - start))
+    return reports
+
+
+def run_tasks(tasks: Iterable[Task], workers: int | None = None) -> list[Report]:
+    """Run all the tasks in a process pool, tasks without an input file are not submitted."""
+    reports: list[Report] = []
+    futures: list[tuple[Task, Future[tuple[int, float]]]] = []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for task in tasks:
+            if not os.path.exists(task.path):
+                reports.append(Report(task, error=MISSING_INPUT))
+                continue
+            futures.append((task, executor.submit(timed_solve, task.solver, task.path)))
+        reports.extend(_report(task, future) for task, future in futures)
+
+    reports.sort(key=lambda r: (r.task.day, r.task.solver.name))
+    return reports
+
+
+def format_time(seconds: float) -> str:
+    if seconds < 1:
+        return f"{seconds * 1000:.2f} ms"
+    return f"{seconds:.3f} s"
+
+
+def format_table(reports: Iterable[Report]) -> str:
+    lines = [f"{'Day':<7}{'Solution':<18}{'Result':<22}{'Time':>12}"]
+    for report in reports:
+        day, name = report.task.day, report.task.solver.name
+        if report.error is not None:
+            lines.append(f"{day:<7}{name:<18}{report.error}")
+            continue
+        assert report.output is not None and report.seconds is not None
+        lines.append(f"{day:<7}{name:<18}{report.output:<22,}{format_time(report.seconds):>12}")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m aoc", description=__doc__)
+    parser.add_argument(
+        "days",
+        metavar="D",
+        nargs="*",
+        type=int,
+        help="Only run the given days (all days by default).",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (defaults to the number of CPUs).",
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Use the test-input.txt file instead of input.txt.",
+    )
+    parser.add_argument(
+        "-p",
+        "--part",
+        type=int,
+        choices=(1, 2),
+        help="Only run the solution for this part.",
+    )
+    parser.add_argument(
+        "-i",
+        "--input",
+        metavar="SOURCE",
+        help="Read the input from SOURCE: a file, '-' for stdin or a file descriptor number. "
+        "Streams are read lazily and can only feed a single solver.",
+    )
+    parser.add_argument("--cache", metavar="DIR", help="Cache the parsed inputs in DIR.")
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="cprofile",
+        choices=PROFILE_MODES,
+        help="Profile the solvers one at a time: 'cprofile' (the default) saves the stats to "
+        "dayNN/<solution>.pstats, 'sample' uses a low-overhead sampling profiler.",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=DEFAULT_TOP,
+        help=f"Number of functions printed by --profile (default: {DEFAULT_TOP}).",
+    )
+    args = parser.parse_args()
+
+    if args.cache is not None:
+        os.environ[CACHE_DIR_ENV] = args.cache
+    source = resolve_source(args.input) if args.input is not None else None
+
+    tasks = list(find_tasks(find_days(args.days), debug=args.debug, part=args.part, source=source))
+    if isinstance(source, int) and len(tasks) != 1:
+        parser.error("a stream input needs exactly one solver, select a day and --part")
+
+    start = time.perf_counter()
+    if args.profile is not None:
+        reports = run_profiled_tasks(tasks, args.profile, args.top)
+    elif isinstance(source, int):
+        reports = [run_stream_task(tasks[0])]
+    else:
+        reports = run_tasks(tasks, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(format_table(reports))
+    print(f"\nTotal wall time: {format_time(elapsed)}")
+    failed = any(report.error not in (None, MISSING_INPUT) for report in reports)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+import functools
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from aoc.day09 import challenge as day09
+from aoc.day11 import challenge as day11
+from aoc.day21 import challenge as day21
+from utils.matrix import Grid
+
+from . import (
+    Solver,
+    find_solvers,
+    open_input,
+    read_lines_from_file,
+    read_lines_from_mmap,
+    relative_input_file_path,
+    relative_test_file,
+    resolve_source,
+)
+from .bench import Benchmark, benchmark, find_regressions, format_table, percentile, run_benchmarks
+from .cache import _MISSING, CACHE_DIR_ENV, ParseCache, active_cache, cached_parser
+from .profiling import SamplingProfiler, run_profiled
+from .runner import (
+    AOC_DIR,
+    MISSING_INPUT,
+    Task,
+    find_days,
+    find_tasks,
+    run_profiled_tasks,
+    run_tasks,
+)
+
+
+def test_find_days():
+    assert find_days([3, 11, 99]) == ["day03", "day11"]
+
+
+def test_find_solvers():
+    assert [s.name for s in find_solvers(day11)] == ["solution_part_1", "solution_part_2"]
+    assert find_solvers(day21) == list(day21.SOLVERS)
+
+
+def test_solver_name():
+    assert Solver(functools.partial(day21.solution_part_1, steps=6)).name == "solution_part_1"
+
+
+def test_run_tasks():
+    tasks = list(find_tasks(["day11"], debug=True))
+    tasks.append(Task("day11", tasks[0].solver, "missing-input.txt"))
+    reports = run_tasks(tasks, workers=2)
+    assert [report.output for report in reports if report.error is None] == [374, 82000210]
+    assert [report.error for report in reports if report.error is not None] == [MISSING_INPUT]
+
+
+def test_percentile():
+    samples = [float(n) for n in range(1, 21)]
+    assert percentile(samples, 95) == 19
+    assert percentile(samples, 50) == 10
+    assert percentile([3.0], 95) == 3
+
+
+def test_find_regressions():
+    baseline = {"day01/a": Benchmark(1, 1, 1, 0), "day01/b": Benchmark(1, 1, 1, 0)}
+    results = {"day01/a": Benchmark(1, 1.05, 2, 0), "day01/b": Benchmark(1, 1.2, 2, 0)}
+    assert find_regressions(results, baseline, threshold=0.1) == ["day01/b"]
+
+
+def test_benchmark():
+    [task, _] = find_tasks(["day11"], debug=True)
+    result = benchmark(task, repeat=3, warmup=0)
+    assert 0 < result.min <= result.median <= result.p95
+    assert result.peak_memory > 0
+
+
+@pytest.mark.parametrize(
+    "content, lines",
+    [
+        (b"", []),
+        (b"abc", [b"abc"]),
+        (b"abc\n\ndef\n", [b"abc", b"", b"def"]),
+        (b"abc\r\ndef\r\n", [b"abc", b"def"]),
+    ],
+)
+def test_read_lines_from_mmap(tmp_path, content, lines):
+    path = tmp_path / "input.txt"
+    path.write_bytes(content)
+    assert [bytes(line) for line in read_lines_from_mmap(path)] == lines
+
+
+def test_mmap_reader_matches_text_reader():
+    mapped = relative_test_file(day11.__file__, reader=read_lines_from_mmap)
+    text = relative_test_file(day11.__file__, reader=read_lines_from_file)
+    assert [bytes(line).decode() for line in mapped] == list(text)
+
+
+def test_grid_from_mmap_lines():
+    mapped = relative_test_file(day11.__file__, reader=read_lines_from_mmap)
+    text = relative_test_file(day11.__file__, reader=read_lines_from_file)
+    assert Grid.from_lines(mapped) == Grid.from_lines(text)
+
+
+@cached_parser
+def parse_lines(input, suffix=""):
+    return [line + suffix for line in input]
+
+
+@cached_parser
+def parse_lazily(input):
+    return (line for line in input)
+
+
+def test_cached_parser(tmp_path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path))
+    input_file = relative_input_file_path(day11.__file__)
+    expected = list(read_lines_from_file(input_file))
+
+    assert parse_lines(open_input(input_file)) == expected
+    assert len(list(tmp_path.glob("*.pickle"))) == 1
+
+    cached_input = open_input(input_file)
+    assert parse_lines(cached_input) == expected
+    assert next(cached_input) == expected[0], "input shouldn't be consumed on a cache hit"
+
+    assert parse_lines(open_input(input_file), suffix="!") == [line + "!" for line in expected]
+    assert len(list(tmp_path.glob("*.pickle"))) == 2
+
+    assert list(parse_lazily(open_input(input_file))) == expected
+    assert len(list(tmp_path.glob("*.pickle"))) == 2
+
+
+def test_cache_disabled(monkeypatch):
+    monkeypatch.delenv(CACHE_DIR_ENV, raising=False)
+    assert active_cache() is None
+    assert parse_lines(iter(["a", "b"]), suffix="c") == ["ac", "bc"]
+
+
+def test_cache_eviction(tmp_path):
+    cache = ParseCache(tmp_path, max_size=400)  # Fits three entries
+    for last_used, key in enumerate(("first", "second", "third")):
+        assert cache.store(key, b"x" * 100)
+        os.utime(tmp_path / f"{key}.pickle", (last_used, last_used))
+    assert cache.load("first") is not None  # Now it's the most recently used
+    cache.store("fourth", b"x" * 100)
+    assert sorted(path.stem for path in tmp_path.glob("*.pickle")) == ["first", "fourth", "third"]
+
+
+def test_cache_stale_classes(tmp_path, monkeypatch):
+    module_dir = tmp_path / "modules"
+    module_dir.mkdir()
+    module_file = module_dir / "cached_classes.py"
+    module_file.write_text("class Parsed:\n    value = 1\n")
+    monkeypatch.syspath_prepend(str(module_dir))
+    monkeypatch.delitem(sys.modules, "cached_classes", raising=False)
+    import cached_classes  # pylint: disable=C0415,E0401
+
+    cache = ParseCache(tmp_path / "cache")
+    assert cache.store("key", [cached_classes.Parsed()])
+    assert isinstance(cache.load("key")[0], cached_classes.Parsed)
+
+    module_file.write_text("class Parsed:\n    value = 2\n")
+    assert cache.load("key") is _MISSING
+    assert not list((tmp_path / "cache").glob("*.pickle")), "stale entries should be evicted"
+
+
+def test_cache_broken_entry(tmp_path):
+    cache = ParseCache(tmp_path)
+    assert cache.store("key", [1, 2, 3])
+    (tmp_path / "key.pickle").write_bytes(b"not a pickle")
+    assert cache.load("key") is _MISSING
+    assert not (tmp_path / "key.pickle").exists()
+
+
+def test_resolve_source():
+    assert resolve_source("-") == 0
+    assert resolve_source("3") == 3
+    assert resolve_source("input.txt") == "input.txt"
+
+
+def test_read_from_stream():
+    read_fd, write_fd = os.pipe()
+    with os.fdopen(write_fd, "w") as pipe:
+        pipe.write("0 3 6 9 12 15\n1 3 6 10 15 21\n")
+    try:
+        assert Solver(day09.solution_part_1).solve(read_fd) == 18 + 28
+        with pytest.raises(ValueError):
+            next(read_lines_from_mmap(read_fd))
+    finally:
+        os.close(read_fd)
+
+
+def test_profile_solver(tmp_path, capsys):
+    [task, _] = find_tasks(["day11"], debug=True)
+    output = run_profiled(task.solver, task.path, "cprofile", tmp_path, top=3)
+    assert output == 374
+    assert (tmp_path / "solution_part_1.pstats").exists()
+    assert "cumulative" in capsys.readouterr().out
+
+
+def failing_solution(_input):
+    raise RuntimeError("broken solver")
+
+
+def test_benchmarks_keep_going():
+    [task, _] = find_tasks(["day11"], debug=True)
+    failing = Task(task.day, Solver(failing_solution), task.path)
+    results, errors = run_benchmarks([failing, task], repeat=1, warmup=0)
+    assert list(results) == ["day11/solution_part_1"]
+    assert errors == {"day11/failing_solution": "RuntimeError: broken solver"}
+    assert format_table(results, errors=errors).endswith(
+        "day11/failing_solution  RuntimeError: broken solver"
+    )
+
+
+def test_profile_tasks_keep_going(capsys):
+    [task, _] = find_tasks(["day11"], debug=True)
+    failing = Task(task.day, Solver(failing_solution), task.path)
+    reports = run_profiled_tasks([failing, task], "sample", top=3)
+    assert reports[0].error == "RuntimeError: broken solver"
+    assert reports[1].output == 374
+    assert "==> day11 solution_part_1" in capsys.readouterr().out
+
+
+def busy_loop(seconds: float) -> None:
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+
+
+def test_sampling_profiler():
+    with SamplingProfiler(interval=0.001) as profiler:
+        busy_loop(0.05)
+    assert profiler.total_samples > 0
+    assert busy_loop.__code__ in profiler.cumulative_samples
+    assert test_sampling_profiler.__code__ not in profiler.cumulative_samples
+
+
+# Cold start budget for importing a challenge module, the runners import every day
+IMPORT_TIME_BUDGET_US = 100_000
+
+
+def cold_import_time(module: str) -> int:
+    """Cumulative import time of a module in a new interpreter, in microseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=AOC_DIR.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        _, cumulative, name = line.rsplit("|", maxsplit=2)
+        if name.strip() == module:
+            return int(cumulative)
+    raise AssertionError(f"{module} wasn't imported")
+
+
+@pytest.mark.parametrize("day", find_days())
+def test_challenge_import_time(day):
+    day_dir = AOC_DIR / day
+    files_before = set(day_dir.iterdir())
+    assert cold_import_time(f"aoc.{day}.challenge") < IMPORT_TIME_BUDGET_US
+    created = set(day_dir.iterdir()) - files_before - {day_dir / "__pycache__"}
+    assert not created, "importing a challenge shouldn't create files"
@@ -1,7 +1,9 @@
 """Module for implementing math formulas/theorems for use in solutions."""
 
 import itertools
-from typing import Sequence
+import math
+from dataclasses import dataclass
+from typing import Callable, Iterable, Self, Sequence
 
 from .matrix import Point
 
@@ -31,3 +33,95 @@ def number_interior_points(area: float, num_boundary_points: int) -> int:
     """
     i = area - (num_boundary_points / 2) + 1
     return int(i)
+
+
+# https://en.wikipedia.org/wiki/Chinese_remainder_theorem#Generalization_to_non-coprime_moduli
+def chinese_remainder(congruences: Iterable[tuple[int, int]]) -> tuple[int, int] | None:
+    """
+    Solve a system of congruences `x = residue (mod modulus)`, given as (residue, modulus)
+    pairs whose moduli don't need to be coprime. Returns the solution as a single
+    congruence (residue, lcm of the moduli), or None if the system has no solution.
+    """
+    residue, modulus = 0, 1
+    for other_residue, other_modulus in congruences:
+        gcd = math.gcd(modulus, other_modulus)
+        difference = other_residue - residue
+        if difference % gcd != 0:
+            return None
+        # Step from `residue` in multiples of `modulus` until it also fits the other congruence
+        step = difference // gcd * pow(modulus // gcd, -1, other_modulus // gcd)
+        residue += modulus * (step % (other_modulus // gcd))
+        modulus = modulus // gcd * other_modulus
+        residue %= modulus
+    return residue, modulus
+
+
+@dataclass(frozen=True, slots=True)
+class EventuallyPeriodic:
+    """
+    Set of non-negative integers that repeats from `start` on. The values below `start` are
+    the `transient` ones, a value from `start` on is in the set if its remainder modulo
+    `period` is one of the `residues`.
+    """
+
+    transient: tuple[int, ...]
+    start: int
+    period: int
+    residues: tuple[int, ...]
+
+    @classmethod
+    def from_values(cls, values: Iterable[int], start: int, period: int) -> Self:
+        """Set made of its values up to the end of the first period after `start`."""
+        values = list(values)
+        return cls(
+            transient=tuple(value for value in values if value < start),
+            start=start,
+            period=period,
+            residues=tuple(sorted({value % period for value in values if value >= start})),
+        )
+
+    def __contains__(self, value: object) -> bool:
+        if not isinstance(value, int):
+            return False
+        if value < self.start:
+            return value in self.transient
+        return value % self.period in self.residues
+
+    def representative(self, value: int) -> int:
+        """Smallest value that repeats `value`, every value before `start` is its own."""
+        if value < self.start:
+            return value
+        return self.start + (value - self.start) % self.period
+
+
+def first_common_value(
+    sets: Sequence[EventuallyPeriodic],
+    accept: Callable[[tuple[int, ...]], bool] | None = None,
+) -> int | None:
+    """
+    Smallest value in all the sets, if there is one. `accept` can reject some of the common
+    values, it is given the representative of a value in each set, so rejecting a value also
+    rejects every value with the same representatives.
+    """
+
+    def accepted(value: int) -> bool:
+        return accept is None or accept(tuple(s.representative(value) for s in sets))
+
+    candidates = [
+        value
+        for values in sets
+        for value in values.transient
+        if all(value in others for others in sets) and accepted(value)
+    ]
+    last_start = max(values.start for values in sets)
+    residue_choices = ([(residue, values.period) for residue in values.residues] for values in sets)
+    for congruences in itertools.product(*residue_choices):
+        solution = chinese_remainder(congruences)
+        if solution is None:
+            continue
+        residue, modulus = solution
+        # Smallest value from which every set repeats
+        value = residue + modulus * -((residue - last_start) // modulus)
+        if accepted(value):
+            candidates.append(value)
+    return min(candidates, default=None)
@@ -1,5 +1,6 @@
 import enum
 import operator
+from array import array
 from typing import (
     Generic,
     Iterable,
@@ -87,6 +88,148 @@ class Cell(NamedTuple, Generic[T]):
     column: int
 
 
+class Grid:
+    """
+    2D grid of single byte characters, stored row after row in a flat `bytearray`.
+    Cells are addressed by their index `row * width + column`, see `index` and `point`.
+    """
+
+    __slots__ = ("cells", "width", "height")
+
+    def __init__(self, cells: bytearray, width: int) -> None:
+        if width <= 0 or len(cells) % width != 0:
+            raise ValueError("cells should be a whole number of rows of the given width")
+        self.cells = cells
+        self.width = width
+        self.height = len(cells) // width
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str | bytes | memoryview]) -> Self:
+        """
+        Creates a grid from its rows, empty lines are ignored. Rows can also be bytes-like,
+        such as the lines of `aoc.tools.read_lines_from_mmap`.
+        """
+        cells = bytearray()
+        width = 0
+        for line in lines:
+            if not line:
+                continue
+            if not width:
+                width = len(line)
+            elif len(line) != width:
+                raise ValueError("All the rows of a grid must have the same length")
+            cells += line.encode("ascii") if isinstance(line, str) else line
+        return cls(cells, width)
+
+    @property
+    def offsets(self) -> tuple[int, int, int, int]:
+        """Index offsets to the adjacent cells, in the same order as `Direction`."""
+        return -self.width, 1, self.width, -1
+
+    def index(self, row: int, column: int) -> int:
+        return row * self.width + column
+
+    def point(self, index: int) -> Point:
+        return Point(*divmod(index, self.width))
+
+    def pack(self, point: Point) -> int:
+        """Index of the cell at `point`, the inverse of `point`."""
+        if not self.in_bounds(*point):
+            raise IndexError(f"{point} is out of the grid")
+        return self.index(*point)
+
+    def in_bounds(self, row: int, column: int) -> bool:
+        return 0 <= row < self.height and 0 <= column < self.width
+
+    def neighbours(self, index: int) -> list[int]:
+        """Indices of the adjacent cells (up, right, down, left) that are within the grid."""
+        row, column = divmod(index, self.width)
+        adjacent: list[int] = []
+        if row > 0:
+            adjacent.append(index - self.width)
+        if column < self.width - 1:
+            adjacent.append(index + 1)
+        if row < self.height - 1:
+            adjacent.append(index + self.width)
+        if column > 0:
+            adjacent.append(index - 1)
+        return adjacent
+
+    def step(self, index: int, direction: Direction) -> int | None:
+        """Index of the adjacent cell towards `direction`, None if it is outside the grid."""
+        row, column = divmod(index, self.width)
+        row += direction.row
+        column += direction.column
+        if self.in_bounds(row, column):
+            return row * self.width + column
+        return None
+
+    def neighbour_table(self) -> "array[int]":
+        """
+        Adjacent cells of every cell, built once so hot loops only need a lookup. The
+        neighbour of `index` towards the i-th `Direction` is `table[index * 4 + i]`, or -1
+        if it falls outside the grid.
+        """
+        width = self.width
+        table = array("q", [-1]) * (4 * len(self.cells))
+        for i, (row_step, column_step) in enumerate(Direction):
+            offset = row_step * width + column_step
+            for row in range(max(0, -row_step), self.height - max(0, row_step)):
+                first = row * width + max(0, -column_step)
+                last = (row + 1) * width - max(0, column_step)
+                table[first * 4 + i : last * 4 + i : 4] = array(
+                    "q", range(first + offset, last + offset)
+                )
+        return table
+
+    def find(self, char: str) -> int:
+        """Index of the first cell with the given character, raises ValueError if missing."""
+        return self.cells.index(ord(char))
+
+    def row(self, row: int) -> memoryview:
+        start = row * self.width
+        return memoryview(self.cells)[start : start + self.width]
+
+    def column(self, column: int) -> memoryview:
+        return memoryview(self.cells)[column :: self.width]
+
+    def rows(self) -> Iterator[memoryview]:
+        return (self.row(row) for row in range(self.height))
+
+    def columns(self) -> Iterator[memoryview]:
+        return (self.column(column) for column in range(self.width))
+
+    def copy(self) -> Self:
+        return self.__class__(self.cells.copy(), self.width)
+
+    def tiled(self, rows: int, columns: int) -> Self:
+        """New grid made of `rows` by `columns` copies of this one."""
+        tiled_rows = b"".join(row.tobytes() * columns for row in self.rows())
+        return self.__class__(bytearray(tiled_rows * rows), self.width * columns)
+
+    def _to_index(self, key: int | Point) -> int:
+        if isinstance(key, Point):
+            return self.pack(key)
+        return key
+
+    def __getitem__(self, key: int | Point) -> str:
+        return chr(self.cells[self._to_index(key)])
+
+    def __setitem__(self, key: int | Point, value: str) -> None:
+        self.cells[self._to_index(key)] = ord(value)
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, type(self)):
+            return (self.width, self.cells) == (other.width, other.cells)
+        return NotImplemented
+
+    def __str__(self) -> str:
+        return "\n".join(row.tobytes().decode("ascii") for row in self.rows())
+
+
 def itranspose(m: Iterable[Iterable[T]], /) -> Iterator[tuple[T, ...]]:
     """Same as `transpose`, but in iterator form."""
     return zip(*m, strict=True)
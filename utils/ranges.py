@@ -0,0 +1,102 @@
+"""Sets of integers stored as sorted half-open intervals."""
+
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Iterator, Protocol, Sequence
+
+
+class Shifts(Protocol):
+    """
+    Piecewise map that adds `offsets[i]` to the values in `[starts[i], stops[i])` and maps
+    every other value to itself. The intervals are sorted and don't overlap.
+    """
+
+    @property
+    def starts(self) -> Sequence[int]:
+        ...
+
+    @property
+    def stops(self) -> Sequence[int]:
+        ...
+
+    @property
+    def offsets(self) -> Sequence[int]:
+        ...
+
+
+class RangeSet:
+    """
+    Sorted, coalesced (neither overlapping nor adjacent) half-open intervals, kept in
+    parallel arrays of starts and stops.
+    """
+
+    __slots__ = ("starts", "stops")
+
+    def __init__(self, intervals: Iterable[range | tuple[int, int]] = ()) -> None:
+        self.starts = array("q")
+        self.stops = array("q")
+        bounds = ((r.start, r.stop) if isinstance(r, range) else r for r in intervals)
+        for start, stop in sorted(bounds):
+            if start >= stop:
+                continue
+            if self.stops and start <= self.stops[-1]:
+                self.stops[-1] = max(self.stops[-1], stop)
+            else:
+                self.starts.append(start)
+                self.stops.append(stop)
+
+    def map_through(self, shifts: Shifts) -> "RangeSet":
+        """
+        Image of the set under a piecewise map, sweeping the intervals and the pieces of the
+        map together in a single pass.
+        """
+        m_starts, m_stops, offsets = shifts.starts, shifts.stops, shifts.offsets
+        pieces: list[tuple[int, int]] = []
+        j = 0
+        for start, stop in zip(self.starts, self.stops):
+            while j < len(m_starts) and m_stops[j] <= start:
+                j += 1
+            position = start
+            while position < stop:
+                if j == len(m_starts) or stop <= m_starts[j]:
+                    pieces.append((position, stop))
+                    break
+                if position < m_starts[j]:
+                    pieces.append((position, m_starts[j]))
+                    position = m_starts[j]
+                end = min(stop, m_stops[j])
+                pieces.append((position + offsets[j], end + offsets[j]))
+                position = end
+                if end == m_stops[j]:
+                    j += 1
+        return RangeSet(pieces)
+
+    def min(self) -> int:
+        if not self.starts:
+            raise ValueError("RangeSet is empty")
+        return self.starts[0]
+
+    def size(self) -> int:
+        """Number of integers in the set."""
+        return sum(self.stops) - sum(self.starts)
+
+    def __contains__(self, value: object) -> bool:
+        if not isinstance(value, int):
+            return False
+        i = bisect_right(self.starts, value) - 1
+        return i >= 0 and value < self.stops[i]
+
+    def __iter__(self) -> Iterator[range]:
+        return map(range, self.starts, self.stops)
+
+    def __len__(self) -> int:
+        """Number of intervals."""
+        return len(self.starts)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RangeSet):
+            return NotImplemented
+        return self.starts == other.starts and self.stops == other.stops
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)})"
@@ -1,9 +1,24 @@
+from typing import NamedTuple
+
 import pytest
 
-from .extra_math import number_interior_points, shoelace_formula
+from .extra_math import (
+    EventuallyPeriodic,
+    chinese_remainder,
+    first_common_value,
+    number_interior_points,
+    shoelace_formula,
+)
 from .iterutils import predict_prev_number
 from .matrix import Point as P
-from .matrix import adjacent_cells_to_cell, adjacent_cells_to_line, calc_position_deviation
+from .matrix import (
+    Direction,
+    Grid,
+    adjacent_cells_to_cell,
+    adjacent_cells_to_line,
+    calc_position_deviation,
+)
+from .ranges import RangeSet
 
 # fmt: off
 MATRIX = [
@@ -107,3 +122,110 @@ def test_shoelace_formula(points, xresult):
 )
 def test_number_interior_points(area, num_boundary, num_interior):
     assert number_interior_points(area, num_boundary) == num_interior
+
+
+GRID_LINES = ["#.#", "..S", "###", ".#."]
+
+
+def test_grid_indices():
+    grid = Grid.from_lines(GRID_LINES)
+    assert (grid.width, grid.height, len(grid)) == (3, 4, 12)
+    assert grid.find("S") == grid.index(1, 2) == 5
+    assert grid.point(5) == P(1, 2)
+    assert grid[5] == grid[P(1, 2)] == "S"
+    assert str(grid) == "\n".join(GRID_LINES)
+    with pytest.raises(IndexError):
+        _ = grid[P(1, 3)]
+
+
+@pytest.mark.parametrize(
+    "index, neighbours",
+    [
+        (0, [1, 3]),
+        (4, [1, 5, 7, 3]),
+        (5, [2, 8, 4]),
+        (11, [8, 10]),
+    ],
+)
+def test_grid_neighbours(index, neighbours):
+    grid = Grid.from_lines(GRID_LINES)
+    assert grid.neighbours(index) == neighbours
+    assert all(n - index in grid.offsets for n in neighbours)
+
+
+def test_grid_views():
+    grid = Grid.from_lines(GRID_LINES)
+    assert grid.row(1) == b"..S"
+    assert grid.column(2) == b"#S#."
+    grid.column(0)[:] = b"OOOO"
+    assert [row.tobytes() for row in grid.rows()] == [b"O.#", b"O.S", b"O##", b"O#."]
+    with pytest.raises(ValueError):
+        Grid.from_lines(["..", "..."])
+
+
+def test_grid_tiled():
+    grid = Grid.from_lines(["#.", ".S"])
+    assert str(grid.tiled(2, 3)) == "#.#.#.\n.S.S.S\n#.#.#.\n.S.S.S"
+
+
+def test_grid_packed_points():
+    grid = Grid.from_lines(GRID_LINES)
+    table = grid.neighbour_table()
+    for index in range(len(grid)):
+        assert grid.pack(grid.point(index)) == index
+        for i, direction in enumerate(Direction):
+            expected = grid.step(index, direction)
+            assert table[index * 4 + i] == (-1 if expected is None else expected)
+        assert sorted(n for n in table[index * 4 : index * 4 + 4] if n >= 0) == sorted(
+            grid.neighbours(index)
+        )
+    assert grid.step(0, Direction.UP) is None
+    assert grid.step(0, Direction.DOWN) == 3
+
+
+@pytest.mark.parametrize(
+    "congruences, solution",
+    [
+        ([], (0, 1)),
+        ([(0, 3), (0, 5)], (0, 15)),
+        ([(2, 3), (3, 5), (2, 7)], (23, 105)),
+        ([(1, 4), (3, 6)], (9, 12)),
+        ([(2, 4), (1, 6)], None),
+    ],
+)
+def test_chinese_remainder(congruences, solution):
+    assert chinese_remainder(congruences) == solution
+
+
+def test_range_set():
+    ranges = RangeSet([range(10, 20), (15, 25), range(30, 30), (25, 27), range(0, 5)])
+    assert list(ranges) == [range(0, 5), range(10, 27)]
+    assert ranges.size() == 22 and ranges.min() == 0
+    assert 26 in ranges and 27 not in ranges and 7 not in ranges
+
+
+class ShiftTable(NamedTuple):
+    starts: list[int]
+    stops: list[int]
+    offsets: list[int]
+
+
+def test_range_set_map_through():
+    shifts = ShiftTable(starts=[5, 12], stops=[10, 20], offsets=[100, -12])
+    mapped = RangeSet([range(0, 15), range(18, 25)]).map_through(shifts)
+    assert list(mapped) == [range(0, 5), range(6, 8), range(10, 12), range(20, 25), range(105, 110)]
+
+
+def test_eventually_periodic():
+    values = EventuallyPeriodic.from_values([1, 4, 6, 9, 10], start=5, period=3)
+    assert values == EventuallyPeriodic((1, 4), 5, 3, (0, 1))
+    assert [value for value in range(16) if value in values] == [1, 4, 6, 7, 9, 10, 12, 13, 15]
+    assert values.representative(4) == 4 and values.representative(13) == 7
+
+
+def test_first_common_value():
+    evens = EventuallyPeriodic((), 2, 2, (0,))
+    threes = EventuallyPeriodic((1,), 1, 3, (1,))
+    assert first_common_value([evens, threes]) == 4
+    assert first_common_value([evens, threes], accept=lambda r: r != (2, 1)) is None
+    assert first_common_value([EventuallyPeriodic((0,), 1, 2, ()), evens]) is None